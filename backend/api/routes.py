@@ -2,8 +2,13 @@
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from services.simulation import SimulationEngine
-from services.websocket_manager import ConnectionManager
+from services.websocket_manager import (
+    ConnectionManager, ENCODING_JSON, ENCODING_BINARY, ENCODING_DELTA, ENCODING_COLUMNS,
+)
 import asyncio
+import logging
+
+log = logging.getLogger(__name__)
 
 router = APIRouter()
 sim_engine = SimulationEngine()
@@ -22,19 +27,40 @@ class ParameterUpdate(BaseModel):
     add_bad_actors: int = None
 
 
+TICK_RATE_HZ = 30
+
+
+async def broadcast_state():
+    # JSON stays the default; clients that sent set_encoding=binary get the
+    # quantized frame instead, set_encoding=delta gets state_delta diffs and
+    # set_encoding=columns gets the agents as per-field arrays.
+    if ws_manager.get_connection_count() == 0:
+        return
+    binary_clients = ws_manager.connections_using(ENCODING_BINARY)
+    if binary_clients:
+        await ws_manager.broadcast_bytes(sim_engine.get_broadcast_frame(), binary_clients)
+    column_clients = ws_manager.connections_using(ENCODING_COLUMNS)
+    if column_clients:
+        await ws_manager.broadcast(sim_engine.get_broadcast_columns(), column_clients)
+    json_clients = ws_manager.connections_using(ENCODING_JSON)
+    delta_clients = ws_manager.connections_using(ENCODING_DELTA)
+    if json_clients or delta_clients:
+        message = sim_engine.get_broadcast_state()
+        if json_clients:
+            await ws_manager.broadcast(message, json_clients)
+        if delta_clients:
+            await ws_manager.broadcast_delta(message, delta_clients)
+
+sim_engine.set_broadcast_callback(broadcast_state)
+
+
 async def simulation_loop():
-    while sim_engine.running:
-        sim_engine.step()
-        if sim_engine.should_broadcast() and ws_manager.get_connection_count() > 0:
-            state = sim_engine.get_broadcast_state()
-            await ws_manager.broadcast(state)
-        await asyncio.sleep(1/30)
+    await sim_engine.run(hz=TICK_RATE_HZ)
 
 
 async def idle_loop():
     while True:
-        state = sim_engine.get_broadcast_state()
-        await ws_manager.broadcast(state)
+        await broadcast_state()
         await asyncio.sleep(1)
 
 @router.post("/simulation/start")
@@ -91,7 +117,7 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_json()
-            print("Received WebSocket message >>> ", data)
+            log.debug("ws message: %s", data)
             if not isinstance(data, dict):
                 continue
 
@@ -119,8 +145,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 sim_engine.pause()
                 report = sim_engine.state.compile_final_report()
                 sim_engine.state.reports = []
-                print("FINAL REPORT => " + str(report))
-                print("------------------------------")
+                log.info("final report: %s", report)
                 await ws_manager.broadcast_json({'type': 'report_final', 'payload': {'final_report': report}})
 
             elif cmd_type == "reset":
@@ -143,9 +168,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 try:
                     payload = data.get("payload", {})
                     sim_engine.add_custom_agent(payload)
-                    print(f"ADD_AGENT: {payload}")
+                    log.debug("add_agent: %s", payload)
                 except Exception as e:
-                    print(f"Error ADD_AGENT: {e}")
+                    log.warning("add_agent failed: %s", e)
 
             elif cmd_type == "create_group":
                 try:
@@ -162,9 +187,9 @@ async def websocket_endpoint(websocket: WebSocket):
                         {"type": "group_created", "payload": result}, websocket
                     )
                     
-                    print(f"CREATE_GROUP {group_id}: {result}")
+                    log.debug("create_group %d: %s", group_id, result)
                 except Exception as e:
-                    print(f"Error CREATE_GROUP: {e}")
+                    log.warning("create_group failed: %s", e)
                     await ws_manager.send_personal_message(
                         {"type": "group_created", "payload": {"error": str(e)}}, websocket
                     )
@@ -178,7 +203,14 @@ async def websocket_endpoint(websocket: WebSocket):
                         {"type": "group_switched", "payload": result}, websocket
                     )
                 except Exception as e:
-                    print(f"Error SWITCH_GROUP: {e}")
+                    log.warning("switch_group failed: %s", e)
+
+            elif cmd_type == "set_encoding":
+                try:
+                    payload = data.get("payload", {})
+                    ws_manager.set_encoding(websocket, payload.get("encoding", ENCODING_JSON))
+                except ValueError as e:
+                    log.warning("set_encoding failed: %s", e)
 
             elif cmd_type == "update_group_config":
                 try:
@@ -190,12 +222,12 @@ async def websocket_endpoint(websocket: WebSocket):
                         {"type": "group_config_updated", "payload": result}, websocket
                     )
                 except Exception as e:
-                    print(f"Error UPDATE_GROUP_CONFIG: {e}")
+                    log.warning("update_group_config failed: %s", e)
 
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        log.warning("websocket error: %s", e)
         ws_manager.disconnect(websocket)
 
 @router.get("/ws/status")
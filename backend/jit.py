@@ -0,0 +1,23 @@
+# backend/jit.py
+"""
+Optional Numba support.
+
+Kernels are written once as plain loops over NumPy arrays and decorated
+with `njit`. When Numba is installed they are compiled to native code;
+otherwise the decorator is a no-op and the same code runs as Python.
+
+Kernels stay serial: parallel (prange) kernels hang process exit when
+the tick runs off the main thread, so prange is deliberately not exported.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
@@ -4,6 +4,16 @@ from typing import Optional
 from enum import IntEnum, auto
 import random
 import math
+# Bound to the module-level Random at import, so random.seed() still applies
+from random import uniform as _uniform, choice as _choice
+import numpy as np
+
+# Per-axis velocity cap applied after motion
+DEFAULT_MAX_SPEED = 80.0
+
+# Decimal places kept in to_minimal_dict (broadcast payloads)
+POSITION_DECIMALS = 2
+TRUST_DECIMALS = 3
 
 
 class Skill(IntEnum):
@@ -18,17 +28,36 @@ class Skill(IntEnum):
 
     @classmethod
     def random(cls) -> 'Skill':
-        return random.choice(list(cls))
+        return _choice(_SKILLS)
 
     @classmethod
     def random_pair(cls) -> tuple['Skill', 'Skill']:
-        skills = list(cls)
-        possessed = random.choice(skills)
-        needed = random.choice([s for s in skills if s != possessed])
-        return possessed, needed
+        return _choice(_SKILL_PAIRS)
+
+    @classmethod
+    def random_pairs(cls, n: int, rng: np.random.Generator = None) -> tuple[np.ndarray, np.ndarray]:
+        """n random (possessed, needed) pairs as two int8 arrays, never equal."""
+        if rng is None:
+            rng = default_rng()
+        idx = rng.integers(0, len(_SKILL_PAIRS), n)
+        return _PAIR_POSSESSED[idx], _PAIR_NEEDED[idx]
+
+
+def default_rng() -> np.random.Generator:
+    """NumPy generator seeded from the `random` module, so random.seed() keeps batch draws reproducible."""
+    return np.random.default_rng(random.getrandbits(64))
+
 
+_SKILLS = tuple(Skill)
+# Skill names indexed by skill value - 1, read without going through the enum
+_SKILL_NAMES = tuple(skill.name for skill in _SKILLS)
+# Every ordered (possessed, needed) pair of distinct skills (8 x 7 = 56)
+_SKILL_PAIRS = tuple((a, b) for a in _SKILLS for b in _SKILLS if a != b)
+_PAIR_POSSESSED = np.array([a for a, _ in _SKILL_PAIRS], dtype=np.int8)
+_PAIR_NEEDED = np.array([b for _, b in _SKILL_PAIRS], dtype=np.int8)
 
-@dataclass(slots=True)
+
+@dataclass(slots=True, eq=False)
 class Agent:
     agent_id: int
     x: float
@@ -46,6 +75,7 @@ class Agent:
     last_trade_tick: int = 0
     is_custom: bool = False
     group_id: int = 0
+    max_speed: float = DEFAULT_MAX_SPEED
 
     @classmethod
     def create_random(
@@ -58,13 +88,13 @@ class Agent:
         skill_possessed, skill_needed = Skill.random_pair()
         return cls(
             agent_id=agent_id,
-            x=random.uniform(0, bounds[0]),
-            y=random.uniform(0, bounds[1]),
-            vx=random.uniform(-max_speed, max_speed),
-            vy=random.uniform(-max_speed, max_speed),
+            x=_uniform(0, bounds[0]),
+            y=_uniform(0, bounds[1]),
+            vx=_uniform(-max_speed, max_speed),
+            vy=_uniform(-max_speed, max_speed),
             skill_possessed=skill_possessed,
             skill_needed=skill_needed,
-            trust=random.uniform(0.3, 0.7),
+            trust=_uniform(0.3, 0.7),
             trust_quota=trust_quota,
         )
 
@@ -74,22 +104,30 @@ class Agent:
 
         width, height = bounds
 
+        # A reflected coordinate can only leave the world again on the far
+        # side, and only when one step crossed the whole world; in-bounds
+        # positions need no clamp at all.
         if self.x <= 0:
-            self.x = -self.x
+            self.x = 0.0 - self.x
             self.vx = -self.vx
+            if self.x > width:
+                self.x = width
         elif self.x >= width:
             self.x = 2 * width - self.x
             self.vx = -self.vx
+            if self.x < 0.0:
+                self.x = 0.0
 
         if self.y <= 0:
-            self.y = -self.y
+            self.y = 0.0 - self.y
             self.vy = -self.vy
+            if self.y > height:
+                self.y = height
         elif self.y >= height:
             self.y = 2 * height - self.y
             self.vy = -self.vy
-
-        self.x = max(0.0, min(self.x, width))
-        self.y = max(0.0, min(self.y, height))
+            if self.y < 0.0:
+                self.y = 0.0
 
     def meets_quota(self) -> bool:
         return self.trust >= self.trust_quota
@@ -121,8 +159,8 @@ class Agent:
             "y": self.y,
             "vx": self.vx,
             "vy": self.vy,
-            "skill_possessed": self.skill_possessed.name,
-            "skill_needed": self.skill_needed.name,
+            "skill_possessed": _SKILL_NAMES[self.skill_possessed - 1],
+            "skill_needed": _SKILL_NAMES[self.skill_needed - 1],
             "trust": self.trust,
             "trust_quota": self.trust_quota,
             "trust_alpha": self.trust_alpha,
@@ -136,12 +174,12 @@ class Agent:
     def to_minimal_dict(self) -> dict:
         return {
             "id": self.agent_id,
-            "x": self.x,
-            "y": self.y,
-            "vx": self.vx,
-            "vy": self.vy,
-            "trust": self.trust,
-            "trustQuota": self.trust_quota,
+            "x": round(self.x, POSITION_DECIMALS),
+            "y": round(self.y, POSITION_DECIMALS),
+            "vx": round(self.vx, POSITION_DECIMALS),
+            "vy": round(self.vy, POSITION_DECIMALS),
+            "trust": round(self.trust, TRUST_DECIMALS),
+            "trustQuota": round(self.trust_quota, TRUST_DECIMALS),
             "skillPossessed": int(self.skill_possessed),
             "skillNeeded": int(self.skill_needed),
             "tradeCount": self.trade_count,
@@ -155,4 +193,5 @@ class Agent:
         return self.agent_id == other.agent_id
 
     def __hash__(self):
-        return hash(self.agent_id)
\ No newline at end of file
+        # int ids hash to themselves; skip the hash() call
+        return self.agent_id
\ No newline at end of file
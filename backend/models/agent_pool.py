@@ -0,0 +1,476 @@
+# backend/models/agent_pool.py
+from typing import List, Sequence, Union
+import numpy as np
+
+from jit import HAVE_NUMBA, njit
+from .agent import Agent, Skill, DEFAULT_MAX_SPEED, POSITION_DECIMALS, TRUST_DECIMALS, default_rng
+
+
+class AgentPool:
+    """
+    Struct-of-arrays storage for every agent in a simulation.
+
+    Each agent owns one row ("slot") across a set of parallel NumPy columns,
+    so per-tick work (motion, clamps, metrics) runs as a handful of
+    vectorized passes instead of N Python attribute round-trips.
+    Columns are over-allocated; only the first `size` rows are live.
+    """
+
+    # name -> dtype for every per-agent column
+    COLUMNS = {
+        "agent_id": np.int32,
+        "x": np.float32,
+        "y": np.float32,
+        "vx": np.float32,
+        "vy": np.float32,
+        "max_speed": np.float32,
+        "trust": np.float32,
+        "trust_quota": np.float32,
+        # Per-agent trust rates stay float64, like the Agent fields they mirror
+        "trust_alpha": np.float64,
+        "trust_beta": np.float64,
+        "skill_possessed": np.int8,
+        "skill_needed": np.int8,
+        "group_id": np.int8,
+        "is_custom": np.bool_,
+        "trade_count": np.int32,
+        "last_trade_tick": np.int32,
+    }
+
+    __slots__ = ("size", "capacity", "views") + tuple(COLUMNS)
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.capacity = max(1, int(capacity))
+        self.views: List["AgentView"] = []
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self, min_capacity: int) -> None:
+        new_capacity = self.capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.capacity = new_capacity
+
+    def append(self, agent: Agent) -> "AgentView":
+        """Copy a standalone Agent into the next free slot and return its view."""
+        slot = self.size
+        if slot >= self.capacity:
+            self._grow(slot + 1)
+
+        self.agent_id[slot] = agent.agent_id
+        self.x[slot] = agent.x
+        self.y[slot] = agent.y
+        self.vx[slot] = agent.vx
+        self.vy[slot] = agent.vy
+        self.max_speed[slot] = agent.max_speed
+        self.trust[slot] = agent.trust
+        self.trust_quota[slot] = agent.trust_quota
+        self.trust_alpha[slot] = agent.trust_alpha
+        self.trust_beta[slot] = agent.trust_beta
+        self.skill_possessed[slot] = agent.skill_possessed
+        self.skill_needed[slot] = agent.skill_needed
+        self.group_id[slot] = agent.group_id
+        self.is_custom[slot] = agent.is_custom
+        self.trade_count[slot] = agent.trade_count
+        self.last_trade_tick[slot] = agent.last_trade_tick
+        self.size = slot + 1
+
+        view = AgentView._bind(self, slot)
+        self.views.append(view)
+        return view
+
+    def append_random(
+        self,
+        agent_ids: Sequence[int],
+        bounds: Sequence[float],
+        max_speed: float = 50.0,
+        trust_quota: float = 0.5,
+        group_id: int = 0,
+        rng: np.random.Generator = None,
+        trust_alpha: float = 1.0,
+        trust_beta: float = 1.0,
+        is_custom: bool = False,
+    ) -> List["AgentView"]:
+        """
+        Batch form of append(Agent.create_random(...)) for every id in agent_ids.
+
+        Draws all positions, velocities, trust values and skill pairs with a
+        handful of vectorized RNG calls and writes them straight into the
+        next free rows; returns the new views in id order. trust_alpha,
+        trust_beta and is_custom are the per-agent overrides custom agents get.
+        """
+        n = len(agent_ids)
+        start = self.size
+        end = start + n
+        if end > self.capacity:
+            self._grow(end)
+        if rng is None:
+            rng = default_rng()
+        width, height = bounds
+        rows = slice(start, end)
+
+        self.agent_id[rows] = agent_ids
+        self.x[rows] = rng.uniform(0, width, n)
+        self.y[rows] = rng.uniform(0, height, n)
+        self.vx[rows] = rng.uniform(-max_speed, max_speed, n)
+        self.vy[rows] = rng.uniform(-max_speed, max_speed, n)
+        self.max_speed[rows] = DEFAULT_MAX_SPEED
+        self.trust[rows] = rng.uniform(0.3, 0.7, n)
+        self.trust_quota[rows] = trust_quota
+        self.trust_alpha[rows] = trust_alpha
+        self.trust_beta[rows] = trust_beta
+        self.skill_possessed[rows], self.skill_needed[rows] = Skill.random_pairs(n, rng)
+        self.group_id[rows] = group_id
+        self.is_custom[rows] = is_custom
+        self.trade_count[rows] = 0
+        self.last_trade_tick[rows] = 0
+        self.size = end
+
+        views = [AgentView._bind(self, slot) for slot in range(start, end)]
+        self.views.extend(views)
+        return views
+
+    def group_mask(self, group_id: int) -> np.ndarray:
+        """Boolean mask over live slots belonging to group_id."""
+        return self.group_id[:self.size] == group_id
+
+    def provider_matrix(self) -> np.ndarray:
+        """
+        n x n bool matrix: M[i, j] is slot i's can_provide_skill_to(slot j).
+
+        One broadcast comparison of the int8 skill columns instead of n²
+        Agent method calls; np.nonzero(M) gives the (seller, buyer) slots.
+        """
+        n = self.size
+        return self.skill_possessed[:n, None] == self.skill_needed[None, :n]
+
+    def mutual_matrix(self) -> np.ndarray:
+        """n x n bool matrix of Agent.skills_match (both directions provide)."""
+        provides = self.provider_matrix()
+        return provides & provides.T
+
+    # ---- Vectorized per-tick passes ----
+
+    def update_positions(self, dt: Union[float, np.ndarray], bounds: Sequence[float]) -> None:
+        """Vectorized equivalent of Agent.update_position over every live slot.
+
+        dt may be a scalar or a per-slot array (group speed multipliers).
+        With Numba available this is the fused _tick kernel; the NumPy
+        passes below are the fallback.
+        """
+        n = self.size
+        width, height = bounds
+        if HAVE_NUMBA:
+            dt = np.broadcast_to(np.asarray(dt, dtype=np.float32), (n,))
+            _tick(self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], dt, np.float32(width), np.float32(height))
+            return
+        for pos, vel, limit in ((self.x[:n], self.vx[:n], width), (self.y[:n], self.vy[:n], height)):
+            pos += vel * dt
+            # Masks taken before either reflection, matching the if/elif
+            # order; in-place masked writes instead of fancy-indexed gathers
+            low = pos <= 0
+            high = pos >= limit
+            np.subtract(0.0, pos, out=pos, where=low)
+            np.subtract(2 * limit, pos, out=pos, where=high)
+            np.negative(vel, out=vel, where=low | high)
+            # Only a step that crossed the whole world lands outside again
+            np.clip(pos, 0.0, limit, out=pos)
+
+    def advance(
+        self,
+        dt: Union[float, np.ndarray],
+        bounds: Sequence[float],
+        decay: np.ndarray = None,
+        cell_keys: np.ndarray = None,
+        inv_cell: float = 0.0,
+        key_stride: int = 0,
+    ) -> None:
+        """update_positions, clamp_speed and, if decay is given, apply_decay(decay).
+
+        decay is a per-slot trust factor in [0, 1] over the live slots; 1.0
+        leaves a slot unchanged. With Numba all three run in the single
+        _step kernel, so each slot's columns are read and written once per
+        tick instead of once per method.
+
+        If cell_keys is given, it is filled with each slot's packed grid
+        cell key after the move, int(x * inv_cell) * key_stride +
+        int(y * inv_cell) scaled in float32 (CollisionDetector.cell_keys),
+        so the next broadphase can skip hashing the positions again.
+        """
+        n = self.size
+        if not HAVE_NUMBA:
+            self.update_positions(dt, bounds)
+            self.clamp_speed()
+            if decay is not None:
+                self.apply_decay(decay)
+            if cell_keys is not None:
+                inv = np.float32(inv_cell)
+                cell_keys[:n] = (self.x[:n] * inv).astype(np.int64) * key_stride + (self.y[:n] * inv).astype(np.int64)
+            return
+        width, height = bounds
+        dt = np.broadcast_to(np.asarray(dt, dtype=np.float32), (n,))
+        _step(
+            self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], dt,
+            np.float32(width), np.float32(height), self.max_speed[:n],
+            self.trust[:n], _NO_DECAY if decay is None else np.asarray(decay, dtype=np.float32),
+            _NO_KEYS if cell_keys is None else cell_keys[:n], np.float32(inv_cell), key_stride,
+        )
+
+    def clamp_speed(self) -> None:
+        """Clamp each velocity component to [-max_speed, max_speed]."""
+        n = self.size
+        max_speed = self.max_speed[:n]
+        for vel in (self.vx[:n], self.vy[:n]):
+            np.minimum(vel, max_speed, out=vel)
+            np.maximum(vel, -max_speed, out=vel)
+
+    def adjust_trust(self, delta: Union[float, np.ndarray]) -> None:
+        """Vectorized Agent.adjust_trust: trust += delta, clamped to [0, 1].
+
+        delta may be a scalar or a per-slot array over the live slots.
+        """
+        trust = self.trust[:self.size]
+        np.add(trust, delta, out=trust, casting="unsafe")
+        np.clip(trust, 0.0, 1.0, out=trust)
+
+    def meets_quota(self) -> np.ndarray:
+        """Bool mask over live slots whose trust is at or above their quota."""
+        n = self.size
+        return self.trust[:n] >= self.trust_quota[:n]
+
+    def apply_decay(self, factor: Union[float, np.ndarray], mask: np.ndarray = None) -> None:
+        """Vectorized Agent.apply_decay: trust *= factor.
+
+        factor may be a scalar or a per-slot array; mask limits the update
+        to the selected live slots. factor must lie in [0, 1]: trust is
+        already in [0, 1], so the product stays there without a clamp.
+        """
+        trust = self.trust[:self.size]
+        # One in-place pass; masked-out slots are left untouched
+        np.multiply(trust, factor, out=trust, where=True if mask is None else mask, casting="unsafe")
+
+    # ---- Serialization ----
+
+    def to_quantized_bytes(self, bounds: Sequence[float]) -> bytes:
+        """
+        Pack the broadcast columns into a compact little-endian buffer.
+
+        Columns follow each other in QUANTIZED_COLUMNS order, n entries each,
+        widest first so every column starts aligned for a typed-array view.
+        Positions are scaled from [0, bounds] onto the full uint16 range and
+        trust/quota from [0, 1] onto uint8; velocities go out as float16.
+        """
+        n = self.size
+        width, height = bounds
+        return b"".join((
+            self.agent_id[:n].astype("<i4").tobytes(),
+            self.trade_count[:n].astype("<i4").tobytes(),
+            _quantize(self.x[:n], 65535.0 / width, "<u2"),
+            _quantize(self.y[:n], 65535.0 / height, "<u2"),
+            self.vx[:n].astype("<f2").tobytes(),
+            self.vy[:n].astype("<f2").tobytes(),
+            _quantize(self.trust[:n], 255.0, "u1"),
+            _quantize(self.trust_quota[:n], 255.0, "u1"),
+            self.skill_possessed[:n].astype(np.uint8).tobytes(),
+            self.skill_needed[:n].astype(np.uint8).tobytes(),
+            self.group_id[:n].astype(np.uint8).tobytes(),
+            self.is_custom[:n].astype(np.uint8).tobytes(),
+        ))
+
+    def to_columns(self) -> dict:
+        """
+        The to_minimal_dicts fields as one array per key over the live slots.
+
+        Values are views into the pool columns, meant to be serialized
+        immediately by orjson (OPT_SERIALIZE_NUMPY) without any per-agent
+        Python objects.
+        """
+        n = self.size
+        return {
+            "id": self.agent_id[:n],
+            "x": self.x[:n],
+            "y": self.y[:n],
+            "vx": self.vx[:n],
+            "vy": self.vy[:n],
+            "trust": self.trust[:n],
+            "trustQuota": self.trust_quota[:n],
+            "skillPossessed": self.skill_possessed[:n],
+            "skillNeeded": self.skill_needed[:n],
+            "tradeCount": self.trade_count[:n],
+            "isCustom": self.is_custom[:n],
+            "groupId": self.group_id[:n],
+        }
+
+    def to_minimal_dicts(self) -> List[dict]:
+        """Same payload as Agent.to_minimal_dict for every slot, built column-wise.
+
+        Values are rounded like Agent.to_minimal_dict, which also drops the
+        float32 noise (e.g. 769.0523681640625) from the JSON.
+        """
+        n = self.size
+        return [
+            {
+                "id": agent_id,
+                "x": round(x, POSITION_DECIMALS),
+                "y": round(y, POSITION_DECIMALS),
+                "vx": round(vx, POSITION_DECIMALS),
+                "vy": round(vy, POSITION_DECIMALS),
+                "trust": round(trust, TRUST_DECIMALS),
+                "trustQuota": round(quota, TRUST_DECIMALS),
+                "skillPossessed": possessed,
+                "skillNeeded": needed,
+                "tradeCount": trades,
+                "isCustom": custom,
+                "groupId": group_id,
+            }
+            for agent_id, x, y, vx, vy, trust, quota, possessed, needed, trades, custom, group_id in zip(
+                self.agent_id[:n].tolist(),
+                self.x[:n].tolist(),
+                self.y[:n].tolist(),
+                self.vx[:n].tolist(),
+                self.vy[:n].tolist(),
+                self.trust[:n].tolist(),
+                self.trust_quota[:n].tolist(),
+                self.skill_possessed[:n].tolist(),
+                self.skill_needed[:n].tolist(),
+                self.trade_count[:n].tolist(),
+                self.is_custom[:n].tolist(),
+                self.group_id[:n].tolist(),
+            )
+        ]
+
+
+@njit(cache=True, nogil=True)
+def _reflect(p, v, limit):
+    """Wall-reflect one coordinate like Agent.update_position: (position, velocity)."""
+    if p <= 0.0:
+        p = 0.0 - p
+        v = -v
+        if p > limit:
+            p = limit
+    elif p >= limit:
+        p = limit + limit - p
+        v = -v
+        if p < 0.0:
+            p = 0.0
+    return p, v
+
+
+@njit(cache=True, nogil=True)
+def _tick(x, y, vx, vy, dt, width, height):
+    """Move, wall-reflect and clamp every slot in one pass (see update_positions)."""
+    for i in range(x.shape[0]):
+        x[i], vx[i] = _reflect(x[i] + vx[i] * dt[i], vx[i], width)
+        y[i], vy[i] = _reflect(y[i] + vy[i] * dt[i], vy[i], height)
+
+
+@njit(cache=True, nogil=True)
+def _step(x, y, vx, vy, dt, width, height, max_speed, trust, decay, keys, inv_cell, key_stride):
+    """_tick plus the speed clamp, trust decay and cell keys, one visit per slot (see advance).
+
+    An empty decay array skips the trust update, an empty keys array the
+    cell keys.
+    """
+    for i in range(x.shape[0]):
+        s = max_speed[i]
+        xi, vxi = _reflect(x[i] + vx[i] * dt[i], vx[i], width)
+        yi, vyi = _reflect(y[i] + vy[i] * dt[i], vy[i], height)
+        x[i] = xi
+        y[i] = yi
+        vx[i] = min(max(vxi, -s), s)
+        vy[i] = min(max(vyi, -s), s)
+        if decay.shape[0]:
+            trust[i] *= decay[i]
+        if keys.shape[0]:
+            # Hash the stored float32 positions, as CollisionDetector.cell_keys does
+            keys[i] = np.int64(x[i] * inv_cell) * key_stride + np.int64(y[i] * inv_cell)
+
+
+# Stand-in decay and keys arguments for _step on ticks without them
+_NO_DECAY = np.empty(0, dtype=np.float32)
+_NO_KEYS = np.empty(0, dtype=np.int64)
+
+
+# (key, dtype) of each column in to_quantized_bytes, in buffer order
+QUANTIZED_COLUMNS = (
+    ("id", "<i4"),
+    ("tradeCount", "<i4"),
+    ("x", "<u2"),
+    ("y", "<u2"),
+    ("vx", "<f2"),
+    ("vy", "<f2"),
+    ("trust", "u1"),
+    ("trustQuota", "u1"),
+    ("skillPossessed", "u1"),
+    ("skillNeeded", "u1"),
+    ("groupId", "u1"),
+    ("isCustom", "u1"),
+)
+
+
+def _quantize(values: np.ndarray, scale: float, dtype: str) -> bytes:
+    limit = np.iinfo(dtype).max
+    return np.clip(np.rint(values * scale), 0, limit).astype(dtype).tobytes()
+
+
+def _skill(value) -> Skill:
+    return Skill(int(value))
+
+
+def _column(name: str, cast):
+    def fget(self):
+        return cast(getattr(self._pool, name)[self._slot])
+
+    def fset(self, value):
+        getattr(self._pool, name)[self._slot] = value
+
+    return property(fget, fset)
+
+
+class AgentView(Agent):
+    """
+    Agent whose fields live in an AgentPool row.
+
+    Reads and writes go straight to the pool columns, so the existing Agent
+    API (trust logic, collision response, serialization) keeps working on
+    pooled agents without a separate sync step.
+    """
+
+    __slots__ = ("_pool", "_slot")
+
+    agent_id = _column("agent_id", int)
+    x = _column("x", float)
+    y = _column("y", float)
+    vx = _column("vx", float)
+    vy = _column("vy", float)
+    max_speed = _column("max_speed", float)
+    trust = _column("trust", float)
+    trust_quota = _column("trust_quota", float)
+    trust_alpha = _column("trust_alpha", float)
+    trust_beta = _column("trust_beta", float)
+    skill_possessed = _column("skill_possessed", _skill)
+    skill_needed = _column("skill_needed", _skill)
+    group_id = _column("group_id", int)
+    is_custom = _column("is_custom", bool)
+    trade_count = _column("trade_count", int)
+    last_trade_tick = _column("last_trade_tick", int)
+
+    @classmethod
+    def _bind(cls, pool: AgentPool, slot: int) -> "AgentView":
+        view = cls.__new__(cls)
+        view._pool = pool
+        view._slot = slot
+        return view
+
+    @property
+    def slot(self) -> int:
+        return self._slot
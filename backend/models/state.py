@@ -1,10 +1,17 @@
 # backend/models/state.py
 from __future__ import annotations
-from typing import Dict, List, Tuple, Any
+from typing import Deque, Dict, List, Optional, Sequence, Tuple, Any
+from collections import deque
+from dataclasses import dataclass
 from .agent import Agent
+from .agent_pool import AgentPool, QUANTIZED_COLUMNS
+import numpy as np
+import orjson
 import math
+import struct
 
 MAX_GROUPS = 5
+COLLISION_LOG_SIZE = 2500
 
 def _safe_median(values: List[float]) -> float:
     if not values:
@@ -30,6 +37,46 @@ def _series_stats(values: List[float]) -> dict:
     # same as trust stats, but semantically “over time series”
     return _trust_stats(values)
 
+def _avg_and_gini(trusts: np.ndarray) -> Tuple[float, float]:
+    """Mean trust and Gini coefficient of a trust column."""
+    n = trusts.shape[0]
+    if n == 0:
+        return 0.0, 0.0
+    sorted_trusts = np.sort(trusts.astype(np.float64))
+    total = float(sorted_trusts.sum())
+    if total <= 1e-12:
+        gini = 0.0
+    else:
+        cum = float(np.dot(np.arange(1, n + 1, dtype=np.float64), sorted_trusts))
+        gini = (2.0 * cum) / (n * total) - (n + 1) / n
+    return total / n, max(0.0, min(1.0, gini))
+
+
+@dataclass(slots=True)
+class GroupMetrics:
+    """Running trust/trade metrics for one group or the whole simulation."""
+    avg_trust: float = 0.0
+    gini_coefficient: float = 0.0
+    trade_success_rate: float = 0.0
+    trade_count: int = 0
+    total_collisions: int = 0
+
+    def record(self, collisions: int, trades: int) -> None:
+        """Accumulate one tick's pair/trade counts and refresh the success rate."""
+        self.total_collisions += collisions
+        self.trade_count += trades
+        cc = self.total_collisions
+        self.trade_success_rate = (self.trade_count / cc) if cc > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "avgTrust": self.avg_trust,
+            "giniCoefficient": self.gini_coefficient,
+            "tradeSuccessRate": self.trade_success_rate,
+            "tradeCount": self.trade_count,
+            "totalCollisions": self.total_collisions,
+        }
+
 
 class AgentGroup:
     """Config label for a subset of agents. Not a physics boundary."""
@@ -43,10 +90,19 @@ class AgentGroup:
         global_alpha: float = 0.10,
         global_beta: float = 0.05,
         speed_multiplier: float = 1.0,
+        agent_index: Dict[int, Agent] = None,
+        pool: AgentPool = None,
     ):
         self.group_id: int = group_id
+        # agent_id -> AgentView into the pool row holding that agent's state
         self.agents: Dict[int, Agent] = {}
+        self._pool: AgentPool = pool if pool is not None else AgentPool()
+        # Flat id -> agent index shared with the owning SimulationState
+        self._agent_index: Dict[int, Agent] = agent_index if agent_index is not None else {}
         self.bounds: Tuple[float, float] = bounds
+        # Number of is_custom agents; lets the engine pick a resolver
+        # without per-pair override checks when this is zero everywhere.
+        self.custom_count: int = 0
 
         # Per-group config
         self.trust_quota: float = trust_quota
@@ -55,48 +111,66 @@ class AgentGroup:
         self.global_beta: float = global_beta
         self.speed_multiplier: float = speed_multiplier
 
-        # Per-group metrics (for comparison/reports)
-        self.metrics: dict = {
-            "avgTrust": 0.0,
-            "giniCoefficient": 0.0,
-            "agentCount": 0,
-        }
-
-        # Per-group counters (accumulated over whole sim)
-        self.counters: dict = {
-            "totalCollisions": 0,
-            "tradeCount": 0,
-        }
+        # Per-group metrics (for comparison/reports); collision/trade
+        # counts accumulate over the whole sim
+        self.metrics: GroupMetrics = GroupMetrics()
 
     @property
     def agent_count(self) -> int:
         return len(self.agents)
 
-    def add_agent(self, agent: Agent) -> None:
+    def add_agent(self, agent: Agent) -> Agent:
+        """
+        Copy agent into the pool; returns the pooled view now tracked by the group.
+
+        The pool keeps its own copy of the fields, so ticks update the view,
+        not the Agent passed in; callers should hold on to the returned view.
+        Position, velocity and trust are stored as float32, so the view reads
+        them back rounded to float32 precision.
+        """
         agent.group_id = self.group_id
-        self.agents[agent.agent_id] = agent
+        view = self._pool.append(agent)
+        self.agents[agent.agent_id] = view
+        self._agent_index[agent.agent_id] = view
+        if agent.is_custom:
+            self.custom_count += 1
+        return view
+
+    def add_random_agents(
+        self,
+        agent_ids: Sequence[int],
+        max_speed: float = 50.0,
+        trust_quota: Optional[float] = None,
+        trust_alpha: float = 1.0,
+        trust_beta: float = 1.0,
+        is_custom: bool = False,
+    ) -> List[Agent]:
+        """
+        Create random agents for every id straight into the pool (see AgentPool.append_random).
+
+        trust_quota defaults to the group's; custom agents pass their own
+        quota, alpha and beta with is_custom=True.
+        """
+        views = self._pool.append_random(
+            agent_ids, self.bounds,
+            max_speed=max_speed,
+            trust_quota=self.trust_quota if trust_quota is None else trust_quota,
+            group_id=self.group_id,
+            trust_alpha=trust_alpha,
+            trust_beta=trust_beta,
+            is_custom=is_custom,
+        )
+        for view in views:
+            self.agents[view.agent_id] = view
+            self._agent_index[view.agent_id] = view
+        if is_custom:
+            self.custom_count += len(views)
+        return views
 
     def update_metrics(self) -> None:
-        n = len(self.agents)
-        self.metrics["agentCount"] = n
-        if n == 0:
-            self.metrics["avgTrust"] = 0.0
-            self.metrics["giniCoefficient"] = 0.0
-            return
-
-        trusts = [a.trust for a in self.agents.values()]
-        self.metrics["avgTrust"] = sum(trusts) / n
-
-        sorted_trusts = sorted(trusts)
-        cum = 0.0
-        for i, v in enumerate(sorted_trusts, start=1):
-            cum += i * v
-        total = sum(sorted_trusts)
-        if total <= 1e-12:
-            gini = 0.0
-        else:
-            gini = (2.0 * cum) / (n * total) - (n + 1) / n
-        self.metrics["giniCoefficient"] = max(0.0, min(1.0, gini))
+        pool = self._pool
+        trusts = pool.trust[:pool.size][pool.group_mask(self.group_id)]
+        self.metrics.avg_trust, self.metrics.gini_coefficient = _avg_and_gini(trusts)
 
     def get_config(self) -> dict:
         return {
@@ -124,7 +198,11 @@ class AgentGroup:
     def to_broadcast_dict(self) -> dict:
         return {
             "groupId": self.group_id,
-            "metrics": dict(self.metrics),
+            "metrics": {
+                "avgTrust": self.metrics.avg_trust,
+                "giniCoefficient": self.metrics.gini_coefficient,
+                "agentCount": self.agent_count,
+            },
             "config": self.get_config(),
             "agentCount": self.agent_count,
         }
@@ -148,21 +226,23 @@ class SimulationState:
         self.global_beta: float = 0.05
 
         self.groups: Dict[int, AgentGroup] = {}
+        # SoA storage for every agent; groups hold views into it
+        self.pool: AgentPool = AgentPool(capacity=max(64, num_agents))
+        # Every agent across all groups, kept up to date by AgentGroup.add_agent
+        self._all_agents: Dict[int, Agent] = {}
         self.active_group_id: int = 0
         self._next_agent_id: int = 0
         self.events: List[dict] = []
 
-        # Global collision log
-        self.collision_log_global: List[dict] = []
+        # Global collision log: (tick, agent_a, agent_b, trade) tuples.
+        # Only written when debug_logging is on; totals live in global_metrics.
+        self.debug_logging: bool = False
+        self.collision_log_global: Deque[tuple] = deque(maxlen=COLLISION_LOG_SIZE)
 
         # Global metrics across ALL agents
-        self.global_metrics: dict = {
-            "avgTrust": 0.0,
-            "giniCoefficient": 0.0,
-            "tradeSuccessRate": 0.0,
-            "tradeCount": 0,
-            "totalCollisions": 0,
-        }
+        self.global_metrics: GroupMetrics = GroupMetrics()
+        # Set by invalidate_metrics; avg trust / gini are recomputed on next read
+        self._metrics_stale: bool = False
 
         # reporting
         self.reports: List[dict] = []
@@ -175,11 +255,11 @@ class SimulationState:
 
     @property
     def all_agents(self) -> Dict[int, Agent]:
-        """Single flat dict of every agent across all groups."""
-        merged = {}
-        for group in self.groups.values():
-            merged.update(group.agents)
-        return merged
+        """Single flat dict of every agent across all groups.
+
+        Maintained incrementally as agents are added; do not mutate.
+        """
+        return self._all_agents
 
     # ---- Backward compat ----
 
@@ -202,18 +282,19 @@ class SimulationState:
 
     @property
     def metrics(self) -> dict:
-        return self.global_metrics
+        self.ensure_metrics()
+        return self.global_metrics.to_dict()
 
     @metrics.setter
     def metrics(self, value: dict):
         pass
 
     @property
-    def collision_log(self) -> List[dict]:
+    def collision_log(self) -> Deque[tuple]:
         return self.collision_log_global
 
     @collision_log.setter
-    def collision_log(self, value: List[dict]):
+    def collision_log(self, value: Deque[tuple]):
         pass
 
     # ---- Group management ----
@@ -227,17 +308,10 @@ class SimulationState:
             global_alpha=cfg.get("global_alpha", self.global_alpha),
             global_beta=cfg.get("global_beta", self.global_beta),
             speed_multiplier=cfg.get("speed_multiplier", 1.0),
+            agent_index=self._all_agents,
+            pool=self.pool,
         )
-        for _ in range(num_agents):
-            agent = Agent.create_random(
-                agent_id=self._next_agent_id,
-                bounds=self.bounds,
-                max_speed=self.max_speed,
-                trust_quota=group.trust_quota,
-            )
-            agent.group_id = group_id
-            group.agents[agent.agent_id] = agent
-            self._next_agent_id += 1
+        group.add_random_agents(self.allocate_agent_ids(num_agents), max_speed=self.max_speed)
         self.groups[group_id] = group
         return group
 
@@ -268,6 +342,11 @@ class SimulationState:
         self._next_agent_id += 1
         return aid
 
+    def allocate_agent_ids(self, n: int) -> range:
+        first = self._next_agent_id
+        self._next_agent_id += n
+        return range(first, first + n)
+
     # ---- Metrics ----
 
     def update_metrics(self) -> None:
@@ -276,31 +355,19 @@ class SimulationState:
         for group in self.groups.values():
             group.update_metrics()
 
-        # Global
-        all_agents_list = list(self.all_agents.values())
-        n = len(all_agents_list)
-        if n == 0:
-            self.global_metrics["avgTrust"] = 0.0
-            self.global_metrics["giniCoefficient"] = 0.0
-            return
-
-        trusts = [a.trust for a in all_agents_list]
-        self.global_metrics["avgTrust"] = sum(trusts) / n
-
-        sorted_trusts = sorted(trusts)
-        cum = 0.0
-        for i, v in enumerate(sorted_trusts, start=1):
-            cum += i * v
-        total = sum(sorted_trusts)
-        if total <= 1e-12:
-            gini = 0.0
-        else:
-            gini = (2.0 * cum) / (n * total) - (n + 1) / n
-        self.global_metrics["giniCoefficient"] = max(0.0, min(1.0, gini))
-
-        tc = self.global_metrics.get("tradeCount", 0)
-        cc = self.global_metrics.get("totalCollisions", 0)
-        self.global_metrics["tradeSuccessRate"] = (tc / cc) if cc > 0 else 0.0
+        # Global (trade success rate is kept current by GroupMetrics.record)
+        m = self.global_metrics
+        m.avg_trust, m.gini_coefficient = _avg_and_gini(self.pool.trust[:self.pool.size])
+        self._metrics_stale = False
+
+    def invalidate_metrics(self) -> None:
+        """Mark trust metrics out of date after a tick; readers refresh them on demand."""
+        self._metrics_stale = True
+
+    def ensure_metrics(self) -> None:
+        """Run update_metrics if trust moved since it last ran."""
+        if self._metrics_stale:
+            self.update_metrics()
 
     # ---- Events ----
 
@@ -312,30 +379,56 @@ class SimulationState:
     # ---- Serialization ----
 
     def to_dict(self) -> dict:
+        self.ensure_metrics()
         return {
             "tick": self.tick,
             "activeGroupId": self.active_group_id,
             "groups": {gid: g.to_broadcast_dict() for gid, g in self.groups.items()},
             "agents": [a.to_dict() for a in self.all_agents.values()],
-            "metrics": dict(self.global_metrics),
+            "metrics": self.global_metrics.to_dict(),
             "events": list(self.events[-200:]),
         }
 
-    def to_broadcast_dict(self) -> dict:
+    def _broadcast_payload(self) -> dict:
+        """Everything in a state_update payload except the agents."""
+        self.ensure_metrics()
         return {
-            "type": "state_update",
-            "payload": {
-                "tick": self.tick,
-                "activeGroupId": self.active_group_id,
-                "groups": {
-                    str(gid): g.to_broadcast_dict()
-                    for gid, g in self.groups.items()
-                },
-                "agents": [a.to_minimal_dict() for a in self.all_agents.values()],
-                "metrics": dict(self.global_metrics),
-                "bounds": self.bounds,
+            "tick": self.tick,
+            "activeGroupId": self.active_group_id,
+            "groups": {
+                str(gid): g.to_broadcast_dict()
+                for gid, g in self.groups.items()
             },
+            "metrics": self.global_metrics.to_dict(),
+            "bounds": self.bounds,
         }
+
+    def to_broadcast_dict(self) -> dict:
+        payload = self._broadcast_payload()
+        payload["agents"] = self.pool.to_minimal_dicts()
+        return {"type": "state_update", "payload": payload}
+
+    def to_broadcast_columns(self) -> dict:
+        """state_update whose "agents" is a dict of per-field arrays (AgentPool.to_columns)."""
+        payload = self._broadcast_payload()
+        payload["agents"] = self.pool.to_columns()
+        return {"type": "state_update", "payload": payload}
+
+    def to_broadcast_frame(self) -> bytes:
+        """
+        Binary state_update for clients that opted into quantized frames.
+
+        Layout: little-endian uint32 header length, a UTF-8 JSON header (the
+        usual message minus "agents", plus "agentCount" and the column
+        layout), space-padded to a multiple of 4 bytes, then the agent
+        columns from AgentPool.to_quantized_bytes.
+        """
+        payload = self._broadcast_payload()
+        payload["agentCount"] = self.pool.size
+        payload["agentColumns"] = QUANTIZED_COLUMNS
+        header = orjson.dumps({"type": "state_update", "payload": payload})
+        header += b" " * (-len(header) % 4)
+        return struct.pack("<I", len(header)) + header + self.pool.to_quantized_bytes(self.bounds)
     
 
     def record_report_snapshot(self) -> None:
@@ -353,10 +446,10 @@ class SimulationState:
                 "tick": self.tick,
                 "groupId": gid,
                 "agentCount": g.agent_count,
-                "avgTrust": float(g.metrics.get("avgTrust", 0.0)),
-                "giniCoefficient": float(g.metrics.get("giniCoefficient", 0.0)),
-                "totalCollisions": int(g.counters.get("totalCollisions", 0)),
-                "tradeCount": int(g.counters.get("tradeCount", 0)),
+                "avgTrust": float(g.metrics.avg_trust),
+                "giniCoefficient": float(g.metrics.gini_coefficient),
+                "totalCollisions": int(g.metrics.total_collisions),
+                "tradeCount": int(g.metrics.trade_count),
             }
 
         print("group payload made")
@@ -364,11 +457,11 @@ class SimulationState:
         snap = {
             "tick": self.tick,
             "global": {
-                "avgTrust": float(self.global_metrics.get("avgTrust", 0.0)),
-                "giniCoefficient": float(self.global_metrics.get("giniCoefficient", 0.0)),
-                "totalCollisions": int(self.global_metrics.get("totalCollisions", 0)),
-                "tradeCount": int(self.global_metrics.get("tradeCount", 0)),
-                "tradeSuccessRate": float(self.global_metrics.get("tradeSuccessRate", 0.0)),
+                "avgTrust": float(self.global_metrics.avg_trust),
+                "giniCoefficient": float(self.global_metrics.gini_coefficient),
+                "totalCollisions": int(self.global_metrics.total_collisions),
+                "tradeCount": int(self.global_metrics.trade_count),
+                "tradeSuccessRate": float(self.global_metrics.trade_success_rate),
                 "agentCount": int(self.agent_count),
             },
             "groups": group_payload,
@@ -390,7 +483,7 @@ class SimulationState:
         Final aggregated report:
         - Trust stats: computed from final trust values (global + per group)
         - Gini stats: computed from rolling report series (global + per group)
-        - Collisions/trades totals: from counters
+        - Collisions/trades totals: from the accumulated metrics
         """
         all_agents = list(self.all_agents.values())
         global_trusts = [a.trust for a in all_agents]
@@ -407,8 +500,8 @@ class SimulationState:
         global_gini_stats = _series_stats(global_gini_series)
 
         # --- Global collisions/trades ---
-        total_collisions = int(self.global_metrics.get("totalCollisions", 0))
-        trade_count = int(self.global_metrics.get("tradeCount", 0))
+        total_collisions = int(self.global_metrics.total_collisions)
+        trade_count = int(self.global_metrics.trade_count)
         trade_success = (trade_count / total_collisions) if total_collisions > 0 else 0.0
 
         # --- Per-group ---
@@ -424,8 +517,8 @@ class SimulationState:
                     gini_series.append(float(gg))
             gini_stats = _series_stats(gini_series)
 
-            gc = int(group.counters.get("totalCollisions", 0))
-            gt = int(group.counters.get("tradeCount", 0))
+            gc = int(group.metrics.total_collisions)
+            gt = int(group.metrics.trade_count)
             gsuccess = (gt / gc) if gc > 0 else 0.0
 
             group_reports[str(gid)] = {
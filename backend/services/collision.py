@@ -1,8 +1,26 @@
 # backend/services/collision.py
-from typing import List, Tuple, Dict, Set
+from typing import List, Optional, Tuple, Dict, Set
 from collections import defaultdict
 from models.agent import Agent
+from jit import HAVE_NUMBA
+from services.collision_kernels import grid_pairs
 import math
+import numpy as np
+
+
+# Cell (cx, cy) is keyed by the single int cx * CELL_KEY_STRIDE + cy, which is
+# cheaper to hash than a tuple. Positions are clamped to the world, so cell
+# coordinates stay far below the stride and keys never alias.
+CELL_KEY_STRIDE = 1 << 16
+
+# Key offsets of the 3x3 neighborhood around a cell
+NEIGHBOR_OFFSETS = tuple(
+    dx * CELL_KEY_STRIDE + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+)
+_NEIGHBOR_OFFSETS_ARRAY = np.array(NEIGHBOR_OFFSETS, dtype=np.int64)
+
+# Below this many agents a plain O(n²) scan beats bucketing
+BRUTE_FORCE_MAX = 32
 
 
 class SpatialHashGrid:
@@ -16,14 +34,15 @@ class SpatialHashGrid:
     def __init__(self, cell_size: float):
         self.cell_size = cell_size
         self.inv_cell_size = 1.0 / cell_size  # Multiply instead of divide
-        self.grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.grid: Dict[int, List[int]] = defaultdict(list)
     
     def clear(self):
         self.grid.clear()
     
-    def _hash(self, x: float, y: float) -> Tuple[int, int]:
-        """Convert world coordinates to cell coordinates."""
-        return (int(x * self.inv_cell_size), int(y * self.inv_cell_size))
+    def _hash(self, x: float, y: float) -> int:
+        """Convert world coordinates to a packed cell key."""
+        inv = self.inv_cell_size
+        return int(x * inv) * CELL_KEY_STRIDE + int(y * inv)
     
     def insert(self, agent_id: int, x: float, y: float):
         """Insert agent into grid cell."""
@@ -31,14 +50,14 @@ class SpatialHashGrid:
     
     def get_nearby(self, x: float, y: float) -> List[int]:
         """Get all agent IDs in this cell and 8 neighboring cells."""
-        cx, cy = self._hash(x, y)
+        key = self._hash(x, y)
+        grid = self.grid
         nearby = []
         # Check 3x3 neighborhood
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                cell = (cx + dx, cy + dy)
-                if cell in self.grid:
-                    nearby.extend(self.grid[cell])
+        for offset in NEIGHBOR_OFFSETS:
+            cell = grid.get(key + offset)
+            if cell:
+                nearby.extend(cell)
         return nearby
 
 
@@ -97,6 +116,83 @@ class CollisionDetector:
         
         return collisions
     
+    def cell_keys(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Packed grid cell key of every slot, as int64.
+
+        Scaled in float32 like the position columns, so
+        AgentPool.advance(cell_keys=...) produces the same keys.
+        """
+        inv = np.float32(self.grid.inv_cell_size)
+        return (x * inv).astype(np.int64) * CELL_KEY_STRIDE + (y * inv).astype(np.int64)
+
+    def detect_pair_arrays(
+        self, x: np.ndarray, y: np.ndarray, keys: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized collision detection over position columns.
+
+        Slots are bucketed by sorting their packed cell keys; every slot's
+        3x3 neighborhood is then gathered with searchsorted, and the distance
+        test runs once over all candidates. With Numba the neighborhood scan
+        is the compiled grid_pairs loop instead, which skips the candidate
+        arrays. Returns (slots_a, slots_b) int32 arrays with slots_a < slots_b,
+        ordered by (slot_a, slot_b).
+
+        keys may pass in cell_keys(x, y) when the caller already has them,
+        e.g. from the previous tick's motion pass.
+        """
+        n = x.shape[0]
+        if n < 2:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty
+        
+        radius_sq = np.float32(self.collision_radius_sq)
+        
+        if n < BRUTE_FORCE_MAX:
+            dx = x[np.newaxis, :] - x[:, np.newaxis]
+            dy = y[np.newaxis, :] - y[:, np.newaxis]
+            a, b = np.nonzero(np.triu(dx * dx + dy * dy <= radius_sq, k=1))
+            return a.astype(np.int32), b.astype(np.int32)
+        
+        if keys is None:
+            keys = self.cell_keys(x, y)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        if HAVE_NUMBA:
+            return grid_pairs(x, y, keys, order, sorted_keys, _NEIGHBOR_OFFSETS_ARRAY, radius_sq)
+        slots = np.arange(n)
+        
+        cand_a = []
+        cand_b = []
+        for offset in NEIGHBOR_OFFSETS:
+            target = keys + offset
+            lo = np.searchsorted(sorted_keys, target, side="left")
+            counts = np.searchsorted(sorted_keys, target, side="right") - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand each slot's [lo, hi) run into flat (slot, other) candidates
+            run_start = np.cumsum(counts) - counts
+            a = np.repeat(slots, counts)
+            b = order[np.repeat(lo - run_start, counts) + np.arange(total)]
+            keep = a < b
+            cand_a.append(a[keep])
+            cand_b.append(b[keep])
+        
+        if not cand_a:
+            empty = np.empty(0, dtype=np.int32)
+            return empty, empty
+        
+        a = np.concatenate(cand_a)
+        b = np.concatenate(cand_b)
+        dx = x[b] - x[a]
+        dy = y[b] - y[a]
+        hit = dx * dx + dy * dy <= radius_sq
+        a = a[hit]
+        b = b[hit]
+        ordered = np.lexsort((b, a))
+        return a[ordered].astype(np.int32), b[ordered].astype(np.int32)
+    
     def detect_collisions_fast(self, agents: Dict[int, Agent]) -> List[Tuple[int, int]]:
         """
         Even faster version - no duplicate checking set needed.
@@ -134,9 +230,9 @@ class CollisionDetector:
                         collisions.append((min(id1, id2), max(id1, id2)))
         
         # Cross-cell checks (right, bottom-right, bottom, bottom-left neighbors)
-        for (cx, cy), cell_agents in list(self.grid.grid.items()):
+        for key, cell_agents in list(self.grid.grid.items()):
             for dx, dy in ((1, 0), (1, 1), (0, 1), (-1, 1)):
-                neighbor = (cx + dx, cy + dy)
+                neighbor = key + dx * CELL_KEY_STRIDE + dy
                 if neighbor not in self.grid.grid:
                     continue
                 
@@ -173,30 +269,32 @@ class NumpyCollisionDetector:
         if len(agents) < 2:
             return []
         
-        ids = list(agents.keys())
-        n = len(ids)
+        n = len(agents)
         
-        # Vectorized position extraction
-        positions = np.array([(agents[i].x, agents[i].y) for i in ids], dtype=np.float32)
+        # Keep everything in 32-bit lanes: float32 positions/radius and int32
+        # ids, so no comparison silently upcasts the N×N buffers to float64.
+        ids = np.fromiter(agents.keys(), dtype=np.int32, count=n)
+        positions = np.array([(a.x, a.y) for a in agents.values()], dtype=np.float32)
+        radius_sq = np.float32(self.collision_radius_sq)
         
         # For smaller counts, brute force with numpy is actually fast
         if n < 500:
             # Compute all pairwise squared distances
             diff = positions[:, np.newaxis, :] - positions[np.newaxis, :, :]
-            dist_sq = np.sum(diff ** 2, axis=2)
+            dist_sq = np.sum(diff * diff, axis=2)
             
             # Find colliding pairs (upper triangle only)
             i_indices, j_indices = np.where(
-                (dist_sq <= self.collision_radius_sq) & 
+                (dist_sq <= radius_sq) & 
                 (np.triu(np.ones((n, n), dtype=bool), k=1))
             )
             
-            return [(ids[i], ids[j]) for i, j in zip(i_indices, j_indices)]
+            return list(zip(ids[i_indices].tolist(), ids[j_indices].tolist()))
         
         # For larger counts, use scipy's KDTree
         from scipy.spatial import cKDTree
         
         tree = cKDTree(positions)
-        pairs = tree.query_pairs(r=self.collision_radius)
+        pairs = tree.query_pairs(r=self.collision_radius, output_type='ndarray')
         
-        return [(ids[i], ids[j]) for i, j in pairs]
\ No newline at end of file
+        return list(zip(ids[pairs[:, 0]].tolist(), ids[pairs[:, 1]].tolist()))
@@ -0,0 +1,157 @@
+# backend/services/collision_kernels.py
+import math
+import numpy as np
+from jit import njit
+
+EPS = 1e-6
+
+# Index into the response-strength table passed to resolve_pairs:
+# (traded << 1) | skills_match. A trade implies a match, so 0b10 never occurs.
+RESPONSE_NEUTRAL = 0b00
+RESPONSE_HARD = 0b01
+RESPONSE_SOFT = 0b11
+
+
+@njit(cache=True, nogil=True)
+def _push_apart(i, j, x, y, vx, vy, radius, strength):
+    """Separate overlapping agents i/j along their normal and add an impulse.
+
+    Same math as collision_response.apply_* on pool rows.
+    """
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    dist = math.sqrt(dx * dx + dy * dy)
+    if dist < EPS:
+        return
+    nx = dx / dist
+    ny = dy / dist
+
+    penetration = radius - dist
+    if penetration < 0.0:
+        penetration = 0.0
+    correction = penetration * 0.5
+    x[i] += nx * correction
+    y[i] += ny * correction
+    x[j] -= nx * correction
+    y[j] -= ny * correction
+
+    vx[i] += nx * strength
+    vy[i] += ny * strength
+    vx[j] -= nx * strength
+    vy[j] -= ny * strength
+
+
+@njit(cache=True, nogil=True)
+def resolve_pairs(
+    pair_a, pair_b,
+    x, y, vx, vy,
+    trust, trust_ok, trust_alpha, trust_beta, is_custom, has_custom,
+    skill_possessed, skill_needed, group_id, group_alpha, group_beta,
+    trade_count, last_trade_tick, tick,
+    radius, strengths,
+    trades,
+):
+    """
+    Resolve trust and physics for every collision pair, in pair order.
+
+    pair_a/pair_b are pool slots. trust_ok is the quota snapshot taken at
+    the start of the tick. Group alpha/beta are looked up by group id;
+    custom agents (only checked when has_custom) use their own values.
+    strengths holds the separation impulse per response code (see
+    RESPONSE_*). Writes trades[k] = True where pair k traded.
+    """
+    for k in range(pair_a.shape[0]):
+        i = pair_a[k]
+        j = pair_b[k]
+
+        skills_match = (skill_possessed[i] == skill_needed[j]) or (skill_possessed[j] == skill_needed[i])
+        trade = False
+
+        if skills_match:
+            ok_i = trust_ok[i]
+            ok_j = trust_ok[j]
+            if ok_i or ok_j:
+                gi = group_id[i]
+                gj = group_id[j]
+                if has_custom and is_custom[i]:
+                    alpha_i = trust_alpha[i]
+                    beta_i = trust_beta[i]
+                else:
+                    alpha_i = group_alpha[gi]
+                    beta_i = group_beta[gi]
+                if has_custom and is_custom[j]:
+                    alpha_j = trust_alpha[j]
+                    beta_j = trust_beta[j]
+                else:
+                    alpha_j = group_alpha[gj]
+                    beta_j = group_beta[gj]
+
+                if ok_i and ok_j:
+                    # Both meet quota -> trade, both trust UP
+                    trust[i] = min(1.0, max(0.0, trust[i] + alpha_i))
+                    trust[j] = min(1.0, max(0.0, trust[j] + alpha_j))
+                    trade = True
+                elif ok_i:
+                    # Only i met quota -> i loses trust
+                    trust[i] = min(1.0, max(0.0, trust[i] - beta_i))
+                else:
+                    trust[j] = min(1.0, max(0.0, trust[j] - beta_j))
+
+        if trade:
+            trade_count[i] += 1
+            trade_count[j] += 1
+            last_trade_tick[i] = tick
+            last_trade_tick[j] = tick
+
+        # Soft after a trade, hard on a skill match without one, else neutral
+        _push_apart(i, j, x, y, vx, vy, radius, strengths[(trade << 1) | skills_match])
+
+        trades[k] = trade
+
+
+@njit(cache=True, nogil=True)
+def grid_pairs(x, y, keys, order, sorted_keys, offsets, radius_sq):
+    """Slot pairs (a < b) within radius, probing each slot's neighbor cells.
+
+    keys are the packed cell keys of every slot, order their argsort and
+    sorted_keys = keys[order]; offsets are the key offsets of the cells to
+    probe. Pairs come back as int32 arrays ordered by (a, b), the same
+    output as the NumPy path of CollisionDetector.detect_pair_arrays.
+    """
+    n = x.shape[0]
+    capacity = 4 * n
+    out_a = np.empty(capacity, dtype=np.int32)
+    out_b = np.empty(capacity, dtype=np.int32)
+    hits = np.empty(n, dtype=np.int32)
+    count = 0
+    for a in range(n):
+        xa = x[a]
+        ya = y[a]
+        m = 0
+        for offset in offsets:
+            target = keys[a] + offset
+            k = np.searchsorted(sorted_keys, target)
+            while k < n and sorted_keys[k] == target:
+                b = order[k]
+                k += 1
+                if b <= a:
+                    continue
+                dx = x[b] - xa
+                dy = y[b] - ya
+                if dx * dx + dy * dy <= radius_sq:
+                    hits[m] = b
+                    m += 1
+        if m == 0:
+            continue
+        if count + m > capacity:
+            capacity = max(2 * capacity, count + m)
+            grown_a = np.empty(capacity, dtype=np.int32)
+            grown_b = np.empty(capacity, dtype=np.int32)
+            grown_a[:count] = out_a[:count]
+            grown_b[:count] = out_b[:count]
+            out_a = grown_a
+            out_b = grown_b
+        out_a[count:count + m] = a
+        out_b[count:count + m] = np.sort(hits[:m])
+        count += m
+    return out_a[:count].copy(), out_b[:count].copy()
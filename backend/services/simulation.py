@@ -1,12 +1,18 @@
 # backend/services/simulation.py
 from models.state import SimulationState, MAX_GROUPS
-from services.collision import CollisionDetector
-from services.collision_response import (
-    apply_soft_separation,
-    apply_neutral_bounce,
-    apply_hard_bounce,
+from services.collision import CollisionDetector, CELL_KEY_STRIDE
+from services.collision_kernels import (
+    resolve_pairs,
+    RESPONSE_NEUTRAL,
+    RESPONSE_HARD,
+    RESPONSE_SOFT,
 )
 from typing import Optional, Callable, List
+import asyncio
+import numpy as np
+
+# (alpha, beta) used when an agent's group is missing
+DEFAULT_GROUP_PARAMS = (0.10, 0.05)
 
 def _safe_median(values: List[float]) -> float:
     if not values:
@@ -48,6 +54,18 @@ class SimulationEngine:
         self.broadcast_interval: int = 1
         self.collision_radius: float = 8.0
         self.decay_interval_ticks: int = 30
+        # Per-tick lookup tables indexed by group_id (or response code),
+        # allocated once and refilled by _refresh_tick_tables
+        self._group_alpha = np.empty(MAX_GROUPS, dtype=np.float32)
+        self._group_beta = np.empty(MAX_GROUPS, dtype=np.float32)
+        self._group_speed = np.empty(MAX_GROUPS, dtype=np.float32)
+        self._response_strengths = np.empty(4)
+        self._any_custom: bool = False
+        # Packed grid cell key per slot, written by the motion pass and
+        # reused by the next tick's broadphase; _cell_keys_at holds the
+        # (detector, pool, size, tick) they were computed for
+        self._cell_keys = np.empty(0, dtype=np.int64)
+        self._cell_keys_at: Optional[tuple] = None
 
         # social-physics parameters (LIVE)
         self.soft_separation = 0.8
@@ -84,66 +102,30 @@ class SimulationEngine:
                 collision_radius=self.collision_radius
             )
 
-    def _get_group_params(self, agent):
-        """Get alpha/beta for an agent from their group."""
-        group = self.state.groups.get(agent.group_id)
-        if group:
-            return group.global_alpha, group.global_beta
-        return 0.10, 0.05
-
-    def _clamp(self, v: float) -> float:
-        return max(0.0, min(1.0, v))
-
-    def _resolve_collision_trust(self, a, b) -> bool:
-        """Resolve trust for a collision pair ONCE.
+    def _refresh_tick_tables(self) -> None:
+        """Fill every per-tick lookup table in one pass over the groups.
 
-        Checks both skill directions.
-        Each agent's trust changes use their group's alpha/beta.
-        Custom agents can override with their own values.
-        Returns True if a trade occurred.
+        The tick then runs against these fixed-size arrays instead of
+        re-walking the group dicts in each phase.
         """
-        # Check skill match in both directions
-        ab_match = (a.skill_possessed == b.skill_needed)
-        ba_match = (b.skill_possessed == a.skill_needed)
-
-        if not ab_match and not ba_match:
-            return False
-
-        # Get group params as base
-        a_alpha, a_beta = self._get_group_params(a)
-        b_alpha, b_beta = self._get_group_params(b)
-
-        # Only custom agents override with per-agent values
-        if getattr(a, "is_custom", False):
-            a_alpha = a.trust_alpha
-            a_beta = a.trust_beta
-        if getattr(b, "is_custom", False):
-            b_alpha = b.trust_alpha
-            b_beta = b.trust_beta
-
-        a_ok = (a.trust >= a.trust_quota)
-        b_ok = (b.trust >= b.trust_quota)
-
-        # CASE 1: Neither meets quota → no change
-        if not a_ok and not b_ok:
-            return False
-
-        # CASE 2: Both meet quota AND skills match → trade, both trust UP
-        if a_ok and b_ok:
-            a.trust = self._clamp(a.trust + a_alpha)
-            b.trust = self._clamp(b.trust + b_alpha)
-            return True
-
-        # CASE 3: One meets, other doesn't → the one who met loses trust
-        if a_ok and not b_ok:
-            a.trust = self._clamp(a.trust - a_beta)
-            return False
-
-        if b_ok and not a_ok:
-            b.trust = self._clamp(b.trust - b_beta)
-            return False
-
-        return False
+        group_alpha = self._group_alpha
+        group_beta = self._group_beta
+        group_speed = self._group_speed
+        group_alpha.fill(DEFAULT_GROUP_PARAMS[0])
+        group_beta.fill(DEFAULT_GROUP_PARAMS[1])
+        group_speed.fill(1.0)
+        any_custom = False
+        for gid, g in self.state.groups.items():
+            group_alpha[gid] = g.global_alpha
+            group_beta[gid] = g.global_beta
+            group_speed[gid] = g.speed_multiplier
+            any_custom = any_custom or g.custom_count > 0
+        self._any_custom = any_custom
+
+        strengths = self._response_strengths
+        strengths[RESPONSE_NEUTRAL] = self.neutral_separation
+        strengths[RESPONSE_HARD] = self.hard_separation
+        strengths[RESPONSE_SOFT] = self.soft_separation
 
     def start(self, num_agents: int, trust_decay: float, trust_quota: float):
         """Start the simulation.
@@ -172,16 +154,10 @@ class SimulationEngine:
                     group = self.state.groups[0]
                     group.trust_decay = float(trust_decay)
                     group.trust_quota = float(trust_quota)
-                    from models.agent import Agent
-                    for _ in range(int(num_agents)):
-                        agent = Agent.create_random(
-                            agent_id=self.state.allocate_agent_id(),
-                            bounds=self.state.bounds,
-                            max_speed=self.state.max_speed,
-                            trust_quota=float(trust_quota),
-                        )
-                        agent.group_id = 0
-                        group.add_agent(agent)
+                    group.add_random_agents(
+                        self.state.allocate_agent_ids(int(num_agents)),
+                        max_speed=self.state.max_speed,
+                    )
                 else:
                     self.state._init_group(0, int(num_agents))
 
@@ -190,6 +166,11 @@ class SimulationEngine:
                 collision_radius=self.collision_radius
             )
 
+        # Validate the detector once here; step() lets its errors propagate
+        # instead of silently skipping a tick's collisions.
+        empty = np.empty(0, dtype=np.float32)
+        self.collision_detector.detect_pair_arrays(empty, empty)
+
         self.running = True
         self.tick_counter = 0
 
@@ -198,119 +179,145 @@ class SimulationEngine:
         if not self.running or not self.state:
             return
 
+        state = self.state
         self.tick_counter += 1
-        self.state.tick += 1
-
-        # Flat dict of ALL agents across all groups
-        all_agents = self.state.all_agents
-        bounds = self.state.bounds
-
-        if not all_agents:
+        state.tick += 1
+
+        # Per-tick locals: everything below reads these instead of
+        # re-resolving the attribute chains.
+        tick = state.tick
+        groups = state.groups
+        metrics = state.global_metrics
+        pool = state.pool
+        n = pool.size
+        bounds = state.bounds
+
+        if n == 0:
             return
 
-        # ---- 1) Single collision pass across ALL agents ----
-        try:
-            pairs = self.collision_detector.detect_collisions(all_agents)
-        except Exception as e:
-            print(f"[COLLISION ERROR] {e}")
-            pairs = []
+        group_id = pool.group_id[:n]
 
-        # Global collision count (pairs)
-        self.state.global_metrics["totalCollisions"] += len(pairs)
-
-        trade_directions = 0
+        # ---- 1) Single collision pass across ALL agents ----
+        # Slot pairs come back as int32 arrays the resolver consumes directly.
+        # Cell keys from last tick's motion pass still hold if no agent
+        # joined and the pool and detector are the same.
+        detector = self.collision_detector
+        keys = None
+        cached = self._cell_keys_at
+        if cached is not None and cached[0] is detector and cached[1] is pool and cached[2:] == (n, tick - 1):
+            keys = self._cell_keys[:n]
+        pair_a, pair_b = detector.detect_pair_arrays(pool.x[:n], pool.y[:n], keys)
+        num_pairs = len(pair_a)
+
+        self._refresh_tick_tables()
+
+        # Quota status for every agent in one vectorized compare, before any
+        # pair moves trust, so every pair this tick sees the same exposure.
+        trust_ok = pool.trust[:n] >= pool.trust_quota[:n]
 
         # ---- 2) Resolve collisions ----
-        for id_a, id_b in pairs:
-            a = all_agents[id_a]
-            b = all_agents[id_b]
-
-            ga = self.state.groups.get(a.group_id)
-            gb = self.state.groups.get(b.group_id)
-
-            # Per-group collision counters:
-            # If cross-group collision, count for BOTH groups (exposure).
-            if ga:
-                ga.counters["totalCollisions"] += 1
-            if gb and gb is not ga:
-                gb.counters["totalCollisions"] += 1
-
-            # Resolve trust ONCE per pair.
-            # Each agent's trust change uses their OWN group's alpha/beta.
-            trade = self._resolve_collision_trust(a, b)
-
-            if trade:
-                trade_directions += 1
-
-                # Per-group trade counters (count for both groups if cross-group)
-                if ga:
-                    ga.counters["tradeCount"] += 1
-                if gb and gb is not ga:
-                    gb.counters["tradeCount"] += 1
-
-                a.trade_count += 1
-                b.trade_count += 1
-                a.last_trade_tick = self.state.tick
-                b.last_trade_tick = self.state.tick
-
-            # Physics — same for everyone
-            radius = self.collision_detector.collision_radius
-            if trade:
-                apply_soft_separation(a, b, radius, self.soft_separation)
-            else:
-                # Check if skills matched at all (at least one direction)
-                skills_ab = (a.skill_possessed == b.skill_needed)
-                skills_ba = (b.skill_possessed == a.skill_needed)
-                if skills_ab or skills_ba:
-                    apply_hard_bounce(a, b, radius, self.hard_separation)
-                else:
-                    apply_neutral_bounce(a, b, radius, self.neutral_separation)
-
-            self.state.collision_log_global.append({
-                "tick": self.state.tick,
-                "pair": (a.agent_id, b.agent_id),
-                "trade": trade,
-            })
-
-        # Cap collision log
-        if len(self.state.collision_log_global) > 5000:
-            self.state.collision_log_global = self.state.collision_log_global[-2500:]
-
-        # ---- 3) Motion — per-agent speed from their group ----
-        for agent in all_agents.values():
-            group = self.state.groups.get(agent.group_id)
-            speed_mult = group.speed_multiplier if group else 1.0
-
-            agent.update_position(self.dt * speed_mult, bounds)
-
-            MAX_SPEED = getattr(agent, "max_speed", 80.0)
-            agent.vx = max(min(agent.vx, MAX_SPEED), -MAX_SPEED)
-            agent.vy = max(min(agent.vy, MAX_SPEED), -MAX_SPEED)
-
-        # ---- 4) Global trade metrics ----
-        self.state.global_metrics["tradeCount"] += trade_directions
-        cc = self.state.global_metrics["totalCollisions"]
-        tc = self.state.global_metrics["tradeCount"]
-        self.state.global_metrics["tradeSuccessRate"] = (tc / cc) if cc > 0 else 0.0
+        # Trust cases, trade bookkeeping and the soft/hard/neutral bounce run
+        # in one compiled pass over the slot pairs, in pair order.
+        trades = np.zeros(num_pairs, dtype=np.bool_)
+        resolve_pairs(
+            pair_a, pair_b,
+            pool.x, pool.y, pool.vx, pool.vy,
+            pool.trust, trust_ok, pool.trust_alpha, pool.trust_beta, pool.is_custom,
+            self._any_custom,
+            pool.skill_possessed, pool.skill_needed, pool.group_id,
+            self._group_alpha, self._group_beta,
+            pool.trade_count, pool.last_trade_tick, tick,
+            detector.collision_radius,
+            self._response_strengths,
+            trades,
+        )
+        trade_directions = int(trades.sum())
+
+        # Per-group counters. A cross-group pair counts for BOTH groups
+        # (exposure), a same-group pair once.
+        ga = group_id[pair_a]
+        gb = group_id[pair_b]
+        cross = ga != gb
+        collisions_per_group = (
+            np.bincount(ga, minlength=MAX_GROUPS)
+            + np.bincount(gb[cross], minlength=MAX_GROUPS)
+        )
+        trades_per_group = (
+            np.bincount(ga[trades], minlength=MAX_GROUPS)
+            + np.bincount(gb[trades & cross], minlength=MAX_GROUPS)
+        )
+        for gid, group in groups.items():
+            group.metrics.record(int(collisions_per_group[gid]), int(trades_per_group[gid]))
+
+        if state.debug_logging:
+            ids = pool.agent_id
+            state.collision_log_global.extend(
+                (tick, a_id, b_id, trade)
+                for a_id, b_id, trade in zip(
+                    ids[pair_a].tolist(), ids[pair_b].tolist(), trades.tolist()
+                )
+            )
 
-        # ---- 5) Trust decay — only agents who haven't traded in 30+ ticks ----
+        # ---- 3) Trust decay factor — only agents who haven't traded in 30+ ticks ----
+        decay = None
         if self.decay_interval_ticks > 0 and self.tick_counter % self.decay_interval_ticks == 0:
-            current_tick = self.state.tick
-            for group in self.state.groups.values():
-                decay = max(0.0, min(1.0, group.trust_decay))
-                factor = 1.0 - decay
-                for agent in group.agents.values():
-                    ticks_since_trade = current_tick - agent.last_trade_tick
-                    if ticks_since_trade >= self.decay_interval_ticks:
-                        agent.apply_decay(factor)
-
-        # ---- 6) Update metrics (global + per-group) ----
-        self.state.update_metrics()
+            # Groups with zero decay are skipped; if none decay, so is the decay.
+            decaying = {gid: g.trust_decay for gid, g in groups.items() if g.trust_decay > 0.0}
+            if decaying:
+                # Factor per slot comes from its group's decay rate; slots that
+                # traded recently keep 1.0 and so their trust.
+                decay_factor = np.ones(MAX_GROUPS, dtype=np.float32)
+                for gid, decay_rate in decaying.items():
+                    decay_factor[gid] = 1.0 - min(1.0, decay_rate)
+                decay = decay_factor[group_id]
+                decay[(tick - pool.last_trade_tick[:n]) < self.decay_interval_ticks] = 1.0
+
+        # ---- 4) Motion — per-agent speed from their group ----
+        # One fused pass over the pool: per-slot dt from the group speed
+        # multiplier, wall bounce, velocity clamp, the decay above and the
+        # cell keys for the next tick's collision pass.
+        if self._cell_keys.shape[0] < n:
+            self._cell_keys = np.empty(pool.capacity, dtype=np.int64)
+        pool.advance(
+            self.dt * self._group_speed[group_id], bounds, decay,
+            cell_keys=self._cell_keys, inv_cell=detector.grid.inv_cell_size, key_stride=CELL_KEY_STRIDE,
+        )
+        self._cell_keys_at = (detector, pool, n, tick)
+
+        # ---- 5) Global collision/trade metrics ----
+        metrics.record(num_pairs, trade_directions)
+
+        # ---- 6) Metrics (global + per-group) ----
+        # Trust moved this tick; avg/gini are recomputed when next read
+        # (broadcast, state fetch, report) rather than on every tick.
+        state.invalidate_metrics()
 
         # ---- 7) Rolling report snapshot ----
-        interval = max(1, int(getattr(self.state, "report_interval_ticks", 60)))
-        if self.state.tick % interval == 0:
-            self.state.record_report_snapshot()
+        interval = max(1, int(getattr(state, "report_interval_ticks", 60)))
+        if tick % interval == 0:
+            state.record_report_snapshot()
+
+    async def run(self, hz: float = 30.0):
+        """Step at a fixed rate until paused, broadcasting every broadcast_interval ticks.
+
+        Sleeps until the next tick's deadline instead of a flat 1/hz, so the
+        time spent stepping and broadcasting doesn't stretch the tick period.
+        """
+        loop = asyncio.get_running_loop()
+        period = 1.0 / hz
+        next_tick_at = loop.time()
+        while self.running:
+            self.step()
+            if self.broadcast_callback and self.should_broadcast():
+                await self.broadcast_callback()
+
+            next_tick_at += period
+            delay = next_tick_at - loop.time()
+            if delay < 0:
+                # Fell behind: resync instead of bursting to catch up
+                next_tick_at = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
 
     def end(self) -> dict:
         """
@@ -368,19 +375,13 @@ class SimulationEngine:
 
         group = self.state.get_or_create_group(group_id)
 
-        from models.agent import Agent
-        for _ in range(num_agents):
-            new_id = self.state.allocate_agent_id()
-            new_agent = Agent.create_random(
-                agent_id=new_id,
-                bounds=self.state.bounds,
-                trust_quota=quota,
-            )
-            new_agent.trust_alpha = alpha
-            new_agent.trust_beta = beta
-            new_agent.is_custom = True
-            new_agent.group_id = group_id
-            group.add_agent(new_agent)
+        group.add_random_agents(
+            self.state.allocate_agent_ids(num_agents),
+            trust_quota=quota,
+            trust_alpha=alpha,
+            trust_beta=beta,
+            is_custom=True,
+        )
 
         print(f"Added {num_agents} agents to Group {group_id}: Q={quota}, A={alpha}, B={beta}")
 
@@ -406,6 +407,9 @@ class SimulationEngine:
             self.neutral_separation = float(params["neutral_separation"])
 
         if self.state:
+            if "debug_logging" in params:
+                self.state.debug_logging = bool(params["debug_logging"])
+
             group_params = {}
             if "trust_decay" in params:
                 group_params["trustDecay"] = params["trust_decay"]
@@ -434,5 +438,17 @@ class SimulationEngine:
         if self.state:
             return self.state.to_broadcast_dict()
         return {}
+
+    def get_broadcast_columns(self) -> dict:
+        """Columnar form of get_broadcast_state (see SimulationState.to_broadcast_columns)."""
+        if self.state:
+            return self.state.to_broadcast_columns()
+        return {}
+
+    def get_broadcast_frame(self) -> bytes:
+        """Quantized binary form of get_broadcast_state (see SimulationState.to_broadcast_frame)."""
+        if self.state:
+            return self.state.to_broadcast_frame()
+        return b""
     
 
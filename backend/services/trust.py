@@ -1,111 +1,140 @@
 # backend/services/trust.py
+from typing import NamedTuple, Union
 from models.agent import Agent
+from models.agent_pool import AgentPool, AgentView
+from services.trust_numba import (
+    trust_collide,
+    CASE_NO_SKILL_MATCH,
+    CASE_NEITHER_MEETS_QUOTA,
+    CASE_SELLER_MEETS_BUYER_DOESNT,
+    CASE_BUYER_MEETS_SELLER_DOESNT,
+    CASE_BOTH_MEET_SKILLS_MATCH,
+)
+
+# Case name for each trust_collide case code
+CASE_NAMES = (
+    "no_skill_match",
+    "case_1_neither_meets_quota",
+    "case_2_seller_meets_buyer_doesnt",
+    "case_3_buyer_meets_seller_doesnt",
+    "case_4_both_meet_skills_match",
+)
+
+
+class CollisionResult(NamedTuple):
+    """Outcome of one directional collision (seller -> buyer)."""
+    seller: int
+    buyer: int
+    skills_match: bool
+    case: int
+    trust_delta_seller: float
+    trust_delta_buyer: float
+    trade: bool
+
+    @property
+    def case_name(self) -> str:
+        return CASE_NAMES[self.case]
+
+    def to_dict(self) -> dict:
+        """Plain dict form for collision logging, with the case spelled out."""
+        d = self._asdict()
+        d["case"] = CASE_NAMES[self.case]
+        return d
+
+
+# CollisionResult fields after (seller, buyer) for every no-match outcome:
+# (skills_match, case, trust_delta_seller, trust_delta_buyer, trade)
+_NO_SKILL_MATCH_FIELDS = (False, CASE_NO_SKILL_MATCH, 0.0, 0.0, False)
 
 
 class TrustEngine:
+    __slots__ = ("global_alpha", "global_beta")
+
+    # (seller sign, buyer sign, trade, case code), indexed by (seller_ok << 1) | buyer_ok
+    _CASE_TABLE = (
+        (0.0, 0.0, False, CASE_NEITHER_MEETS_QUOTA),
+        (0.0, -1.0, False, CASE_BUYER_MEETS_SELLER_DOESNT),
+        (-1.0, 0.0, False, CASE_SELLER_MEETS_BUYER_DOESNT),
+        (1.0, 1.0, True, CASE_BOTH_MEET_SKILLS_MATCH),
+    )
+
     def __init__(self, global_alpha: float, global_beta: float):
         self.global_alpha = float(global_alpha)
         self.global_beta = float(global_beta)
 
-    def apply_collision_logic(self, agent1: Agent, agent2: Agent) -> dict:
+    def apply_collision_logic(self, agent1: Agent, agent2: Agent) -> CollisionResult:
         """
         Apply trust logic for collision between two agents.
         Interprets agent1 as seller, agent2 as buyer (per design doc):
           OnCollide(agent1 (seller), agent2 (buyer)) -> OnCollide(agent2, agent1)
 
-        Returns a dict suitable for collision logging.
+        Returns a CollisionResult; .case is a CASE_* code (see CASE_NAMES)
+        and .trade a real bool, so callers can sum it directly. Use
+        .to_dict() for collision logging.
         """
         seller = agent1
         buyer = agent2
 
+        # Pooled agents in the same pool: run the compiled kernel on their rows
+        if isinstance(seller, AgentView) and isinstance(buyer, AgentView) and seller._pool is buyer._pool:
+            return self._apply_collision_pooled(seller, buyer)
+
         # Check skill condition (seller must have what buyer needs)
         skills_match_direction = (seller.skill_possessed == buyer.skill_needed)
 
         # If skill doesn't match in this direction, no trust logic triggers (per doc)
         if not skills_match_direction:
-            return {
-                "seller": getattr(seller, "agent_id", None),
-                "buyer": getattr(buyer, "agent_id", None),
-                "skills_match": False,
-                "case": "no_skill_match",
-                "trust_delta_seller": 0.0,
-                "trust_delta_buyer": 0.0,
-                "trade": False,
-            }
+            return CollisionResult(seller.agent_id, buyer.agent_id, *_NO_SKILL_MATCH_FIELDS)
 
         seller_ok = (seller.trust >= seller.trust_quota)
         buyer_ok = (buyer.trust >= buyer.trust_quota)
 
-        trust_delta_seller = 0.0
-        trust_delta_buyer = 0.0
-        trade = False
-
-        # CASE 1: Neither satisfied with trust quotas -> No change
-        if (not seller_ok) and (not buyer_ok):
-            self._case_1_neither_meets_quota(seller, buyer)
-            case = "case_1_neither_meets_quota"
-
-        # CASE 2: Seller satisfied but buyer not -> Seller trust DOWN
-        elif seller_ok and (not buyer_ok):
-            # Seller gets penalized. Use seller's specific beta penalty? 
-            # Or the system global penalty?
-            # User requirement: "specify a unique set of parameters" for the custom agent.
-            # Interpreting "Transaction Failure Loss" as "How much I lose when I fail" or "How much I punish"?
-            # Typically "My Trust Dynamics parameters" govern how *my* trust changes.
-            # So if Seller's trust is changing, we use Seller's beta.
-            
-            beta = getattr(seller, "trust_beta", self.global_beta)
-            trust_delta_seller = -beta
-            self._case_2_seller_meets_buyer_doesnt(seller, buyer, beta)
-            case = "case_2_seller_meets_buyer_doesnt"
-
-        # CASE 3: Buyer satisfied but seller not -> Buyer trust DOWN
-        elif buyer_ok and (not seller_ok):
-            beta = getattr(buyer, "trust_beta", self.global_beta)
-            trust_delta_buyer = -beta
-            self._case_3_buyer_meets_seller_doesnt(buyer, seller, beta)
-            case = "case_3_buyer_meets_seller_doesnt"
-
-        # CASE 4: Both satisfied with trust quotas (and skill match already true) -> both trust UP
+        seller_sign, buyer_sign, trade, case = self._CASE_TABLE[(seller_ok << 1) | buyer_ok]
+
+        # A trade rewards both sides by their own alpha; a one-sided quota
+        # failure costs the satisfied agent its own beta
+        if trade:
+            rate_seller = seller.trust_alpha
+            rate_buyer = buyer.trust_alpha
         else:
-            alpha_s = getattr(seller, "trust_alpha", self.global_alpha)
-            alpha_b = getattr(buyer, "trust_alpha", self.global_alpha)
-            
-            trust_delta_seller = +alpha_s
-            trust_delta_buyer = +alpha_b
-            self._case_4_both_meet_skills_match(seller, buyer, alpha_s, alpha_b)
-            case = "case_4_both_meet_skills_match"
-            trade = True
-
-        return {
-            "seller": getattr(seller, "agent_id", None),
-            "buyer": getattr(buyer, "agent_id", None),
-            "skills_match": True,
-            "case": case,
-            "trust_delta_seller": trust_delta_seller,
-            "trust_delta_buyer": trust_delta_buyer,
-            "trade": trade,
-        }
-
-    def _case_1_neither_meets_quota(self, agent1: Agent, agent2: Agent):
-        """No trust change"""
-        # Explicitly do nothing
-        return
-
-    def _case_2_seller_meets_buyer_doesnt(self, seller: Agent, buyer: Agent, beta: float):
-        """Seller trust DOWN"""
-        seller.trust = self._clamp_trust(seller.trust - beta)
-
-    def _case_3_buyer_meets_seller_doesnt(self, buyer: Agent, seller: Agent, beta: float):
-        """Buyer trust DOWN"""
-        buyer.trust = self._clamp_trust(buyer.trust - beta)
-
-    def _case_4_both_meet_skills_match(self, agent1: Agent, agent2: Agent, alpha1: float, alpha2: float):
-        """Both trust UP"""
-        agent1.trust = self._clamp_trust(agent1.trust + alpha1)
-        agent2.trust = self._clamp_trust(agent2.trust + alpha2)
-
-    def apply_decay(self, agents: dict[int, Agent], decay_rate: float):
+            rate_seller = seller.trust_beta
+            rate_buyer = buyer.trust_beta
+
+        trust_delta_seller = seller_sign * rate_seller
+        trust_delta_buyer = buyer_sign * rate_buyer
+        if seller_sign:
+            seller.trust = self._clamp_trust(seller.trust + trust_delta_seller)
+        if buyer_sign:
+            buyer.trust = self._clamp_trust(buyer.trust + trust_delta_buyer)
+
+        return CollisionResult(
+            seller=seller.agent_id,
+            buyer=buyer.agent_id,
+            skills_match=True,
+            case=case,
+            trust_delta_seller=trust_delta_seller,
+            trust_delta_buyer=trust_delta_buyer,
+            trade=trade,
+        )
+
+    def _apply_collision_pooled(self, seller: AgentView, buyer: AgentView) -> CollisionResult:
+        pool = seller._pool
+        case_code, delta_seller, delta_buyer, trade = trust_collide(
+            seller.slot, buyer.slot,
+            pool.trust, pool.trust_quota, pool.trust_alpha, pool.trust_beta,
+            pool.skill_possessed, pool.skill_needed,
+        )
+        return CollisionResult(
+            seller=seller.agent_id,
+            buyer=buyer.agent_id,
+            skills_match=case_code != CASE_NO_SKILL_MATCH,
+            case=int(case_code),
+            trust_delta_seller=float(delta_seller),
+            trust_delta_buyer=float(delta_buyer),
+            trade=bool(trade),
+        )
+
+    def apply_decay(self, agents: Union[dict[int, Agent], AgentPool], decay_rate: float):
         """
         Apply trust decay to all agents.
 
@@ -113,6 +142,8 @@ class TrustEngine:
         (every X ticks) is controlled by the SimulationEngine; this function
         simply applies decay when called.
 
+        agents: dict of agents, or an AgentPool whose whole trust column is
+        decayed in one vectorized multiply.
         decay_rate: float in [0,1], multiplicative factor (e.g. 0.99 means -1%)
         """
         decay_rate = float(decay_rate)
@@ -121,13 +152,14 @@ class TrustEngine:
         if decay_rate > 1.0:
             decay_rate = 1.0
 
+        if isinstance(agents, AgentPool):
+            agents.apply_decay(decay_rate)
+            return
+
+        # trust and decay_rate are both in [0, 1], so the product needs no clamp
         for a in agents.values():
-            a.trust = self._clamp_trust(a.trust * decay_rate)
+            a.trust *= decay_rate
 
     def _clamp_trust(self, trust: float) -> float:
         """Ensure trust stays in [0.0, 1.0]"""
-        if trust < 0.0:
-            return 0.0
-        if trust > 1.0:
-            return 1.0
-        return trust
+        return max(0.0, min(1.0, trust))
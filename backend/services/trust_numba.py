@@ -0,0 +1,46 @@
+# backend/services/trust_numba.py
+from jit import njit
+
+# Case codes returned by trust_collide and carried in services.trust.CollisionResult
+# (names live in services.trust.CASE_NAMES)
+CASE_NO_SKILL_MATCH = 0
+CASE_NEITHER_MEETS_QUOTA = 1
+CASE_SELLER_MEETS_BUYER_DOESNT = 2
+CASE_BUYER_MEETS_SELLER_DOESNT = 3
+CASE_BOTH_MEET_SKILLS_MATCH = 4
+
+
+@njit(cache=True, nogil=True)
+def trust_collide(seller, buyer, trust, trust_quota, trust_alpha, trust_beta, skill_possessed, skill_needed):
+    """
+    Directional seller -> buyer trust update on pool rows.
+
+    Same four cases as TrustEngine.apply_collision_logic, using each agent's
+    own alpha/beta. Mutates trust in place and returns
+    (case_code, trust_delta_seller, trust_delta_buyer, trade).
+    """
+    if skill_possessed[seller] != skill_needed[buyer]:
+        return CASE_NO_SKILL_MATCH, 0.0, 0.0, False
+
+    seller_ok = trust[seller] >= trust_quota[seller]
+    buyer_ok = trust[buyer] >= trust_quota[buyer]
+
+    if not seller_ok and not buyer_ok:
+        return CASE_NEITHER_MEETS_QUOTA, 0.0, 0.0, False
+
+    if seller_ok and not buyer_ok:
+        beta = trust_beta[seller]
+        trust[seller] = min(1.0, max(0.0, trust[seller] - beta))
+        return CASE_SELLER_MEETS_BUYER_DOESNT, -beta, 0.0, False
+
+    if buyer_ok and not seller_ok:
+        beta = trust_beta[buyer]
+        trust[buyer] = min(1.0, max(0.0, trust[buyer] - beta))
+        return CASE_BUYER_MEETS_SELLER_DOESNT, 0.0, -beta, False
+
+    alpha_s = trust_alpha[seller]
+    alpha_b = trust_alpha[buyer]
+    trust[seller] = min(1.0, max(0.0, trust[seller] + alpha_s))
+    trust[buyer] = min(1.0, max(0.0, trust[buyer] + alpha_b))
+    return CASE_BOTH_MEET_SKILLS_MATCH, alpha_s, alpha_b, True
+
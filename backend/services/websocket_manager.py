@@ -1,37 +1,257 @@
 # backend/services/websocket_manager.py
 from fastapi import WebSocket
-from typing import List, Dict
-import json
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 import asyncio
+import logging
+import orjson
+
+log = logging.getLogger(__name__)
+
+# Wire encodings a client can select with a set_encoding command
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+ENCODING_DELTA = "delta"
+ENCODING_COLUMNS = "columns"
+ENCODINGS = (ENCODING_JSON, ENCODING_BINARY, ENCODING_DELTA, ENCODING_COLUMNS)
+
+# Broadcast frames buffered per client before the oldest is dropped
+SEND_QUEUE_SIZE = 4
+
+# A client whose queue overflows is sent only every 2nd, 4th, ... broadcast,
+# up to this stride; after STRIDE_RECOVERY_FRAMES deliveries that find its
+# queue already drained, the stride halves again
+MAX_SEND_STRIDE = 8
+STRIDE_RECOVERY_FRAMES = 30
+
+
+def encode_message(message: dict) -> str:
+    """JSON text for a websocket message (orjson; NumPy scalars/arrays allowed)"""
+    return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def diff_dicts(old: dict, new: dict) -> dict:
+    """Keys of new whose values differ from old (recursing into nested dicts); dropped keys map to None"""
+    diff = {}
+    for key, value in new.items():
+        prev = old.get(key)
+        if isinstance(value, dict) and isinstance(prev, dict):
+            sub = diff_dicts(prev, value)
+            if sub:
+                diff[key] = sub
+        elif key not in old or prev != value:
+            diff[key] = value
+    for key in old.keys() - new.keys():
+        diff[key] = None
+    return diff
+
+
+def diff_agents(old: List[dict], new: List[dict]) -> Tuple[List[dict], List[int]]:
+    """
+    Per-agent changes between two minimal agent lists.
+
+    Returns (changed, removed): each changed entry holds "id" plus only the
+    fields that differ (new agents come through whole), removed holds ids.
+    """
+    previous = {a["id"]: a for a in old}
+    changed = []
+    for agent in new:
+        prev = previous.pop(agent["id"], None)
+        if prev is None:
+            changed.append(agent)
+            continue
+        fields = {k: v for k, v in agent.items() if prev.get(k) != v}
+        if fields:
+            fields["id"] = agent["id"]
+            changed.append(fields)
+    return changed, list(previous)
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.client_data: Dict[WebSocket, dict] = {}
         
     async def connect(self, websocket: WebSocket):
         """Accept and register new WebSocket connection"""
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self.client_data[websocket] = {}
-        print(f"WebSocket connected. Active connections: {len(self.active_connections)}")
+        self.active_connections.add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        # Held around every socket send so direct replies never interleave
+        # with a frame the writer is sending
+        lock = asyncio.Lock()
+        self.client_data[websocket] = {
+            "queue": queue,
+            "lock": lock,
+            "writer": asyncio.create_task(self._writer(websocket, queue, lock)),
+        }
+        log.debug("ws connected: total=%d", len(self.active_connections))
         
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket in self.client_data:
-            del self.client_data[websocket]
-        print(f"WebSocket disconnected. Active connections: {len(self.active_connections)}")
+        self.active_connections.discard(websocket)
+        data = self.client_data.pop(websocket, None)
+        writer = data.get("writer") if data else None
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        log.debug("ws disconnected: total=%d", len(self.active_connections))
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to specific client"""
-        await websocket.send_json(message)
+        text = encode_message(message)
+        lock = self.client_data.get(websocket, {}).get("lock")
+        if lock is None:
+            await websocket.send_text(text)
+            return
+        async with lock:
+            await websocket.send_text(text)
     
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        for connection in self.active_connections:
-            await self.send_personal_message(message, connection)
+    async def broadcast(self, message: dict, connections: Optional[Iterable[WebSocket]] = None):
+        """Broadcast message to all connected clients (or the given subset)"""
+        if connections is None:
+            connections = self.active_connections
+        if not connections:
+            return
+        # Serialize once and fan the same text frame out to every client
+        self._enqueue(connections, encode_message(message))
+
+    async def broadcast_bytes(self, data: bytes, connections: Optional[Iterable[WebSocket]] = None):
+        """Broadcast a binary frame to all connected clients (or the given subset)"""
+        if connections is None:
+            connections = self.active_connections
+        self._enqueue(connections, data)
+
+    async def broadcast_delta(self, message: dict, connections: Iterable[WebSocket]):
+        """
+        Send a state_update to delta-encoding clients as a diff.
+
+        Clients without a snapshot yet get the full message once; after
+        that they receive state_delta messages holding only what changed
+        since the payload they were last sent: changed top-level payload
+        keys, per-agent field changes under "agents", and "removedAgents"
+        ids. Clients on a send stride skip ticks, so their snapshot can lag
+        the others'; one diff is built per distinct snapshot. A client whose
+        queue overflows gets the full message in place of its queued diffs.
+        """
+        connections = list(connections)
+        payload = message.get("payload")
+        if not connections or payload is None:
+            return
+        full_frame: List[str] = []
+
+        def full() -> str:
+            # Encoded at most once, and only if some client needs it
+            if not full_frame:
+                full_frame.append(encode_message(message))
+            return full_frame[0]
+
+        fresh = []
+        by_snapshot: Dict[int, Tuple[dict, List[WebSocket]]] = {}
+        for ws in connections:
+            previous = self.client_data.get(ws, {}).get("snapshot")
+            if previous is None:
+                fresh.append(ws)
+            else:
+                by_snapshot.setdefault(id(previous), (previous, []))[1].append(ws)
+
+        for previous, clients in by_snapshot.values():
+            rest = {k: v for k, v in payload.items() if k != "agents"}
+            delta = diff_dicts({k: v for k, v in previous.items() if k != "agents"}, rest)
+            delta["tick"] = payload["tick"]
+            delta["agents"], delta["removedAgents"] = diff_agents(previous["agents"], payload["agents"])
+            sent = self._enqueue(clients, encode_message({"type": "state_delta", "payload": delta}), full)
+            for ws in sent:
+                self.client_data[ws]["snapshot"] = payload
+        if fresh:
+            for ws in self._enqueue(fresh, full(), full):
+                self.client_data[ws]["snapshot"] = payload
+
+    def _enqueue(
+        self,
+        connections: Iterable[WebSocket],
+        frame: Union[str, bytes],
+        resync: Optional[Callable[[], str]] = None,
+    ) -> List[WebSocket]:
+        """
+        Hand a frame to each client's writer task without waiting on the socket.
+
+        A client whose queue is full loses its oldest pending frame, so a
+        slow connection falls behind on its own instead of stalling the
+        broadcast. Each overflow also doubles that client's send stride
+        (see MAX_SEND_STRIDE), so it is offered fewer frames until it keeps
+        up again.
+
+        Delta frames only make sense in sequence, so when resync is given
+        an overflowing client's whole queue is replaced by the single frame
+        resync() returns (the full state_update). Without it, a delta
+        client that drops a frame loses its snapshot and is resynced on the
+        next broadcast_delta.
+
+        Returns the clients whose queue now ends in a frame they can apply.
+        """
+        queued = []
+        for ws in connections:
+            data = self.client_data.get(ws)
+            if data is None or "queue" not in data:
+                continue
+            stride = data.get("stride", 1)
+            if stride > 1:
+                skipped = data.get("skipped", 0) + 1
+                if skipped < stride:
+                    data["skipped"] = skipped
+                    continue
+                data["skipped"] = 0
+            queue = data["queue"]
+            if queue.full():
+                data["stride"] = min(stride * 2, MAX_SEND_STRIDE)
+                data["drained"] = 0
+                if resync is not None:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(resync())
+                    queued.append(ws)
+                    continue
+                queue.get_nowait()
+                data.pop("snapshot", None)
+            else:
+                if stride > 1 and queue.empty():
+                    drained = data.get("drained", 0) + 1
+                    if drained >= STRIDE_RECOVERY_FRAMES:
+                        data["stride"] = stride // 2
+                        drained = 0
+                    data["drained"] = drained
+                queued.append(ws)
+            queue.put_nowait(frame)
+        return queued
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue, lock: asyncio.Lock):
+        """Per-client task draining queued broadcast frames onto the socket"""
+        try:
+            while True:
+                frame = await queue.get()
+                async with lock:
+                    if isinstance(frame, bytes):
+                        await websocket.send_bytes(frame)
+                    else:
+                        await websocket.send_text(frame)
+        except Exception as e:
+            log.debug("ws send failed: %s", e)
+            self.disconnect(websocket)
+
+    def set_encoding(self, websocket: WebSocket, encoding: str):
+        """Select the state_update encoding for one client (json by default)"""
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        data = self.client_data.setdefault(websocket, {})
+        data["encoding"] = encoding
+        # Switching (back) to delta starts again from a full snapshot
+        data.pop("snapshot", None)
+
+    def connections_using(self, encoding: str) -> List[WebSocket]:
+        """Connections whose selected encoding matches"""
+        return [
+            ws for ws in self.active_connections
+            if self.client_data.get(ws, {}).get("encoding", ENCODING_JSON) == encoding
+        ]
     
     async def broadcast_json(self, data: dict):
         """Broadcast JSON data to all clients"""
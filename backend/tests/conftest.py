@@ -5,3 +5,30 @@ from pathlib import Path
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
+
+import pytest
+from models.agent import Agent, Skill
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: stress tests creating many agents (deselect with -m 'not slow')")
+
+
+@pytest.fixture(scope="module")
+def bounds():
+    """Default world size shared by the tests."""
+    return (800.0, 600.0)
+
+
+@pytest.fixture
+def make_agent():
+    """Factory for Agents with neutral defaults; keyword args override fields."""
+    def _make(**fields):
+        defaults = dict(
+            agent_id=1, x=0.0, y=0.0, vx=0.0, vy=0.0,
+            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
+            trust=0.5, trust_quota=0.5,
+        )
+        defaults.update(fields)
+        return Agent(**defaults)
+    return _make
@@ -17,6 +17,13 @@ pytest backend/tests/test_agent.py::TestAgentMovement -v
 # Run with coverage
 pip install pytest-cov
 pytest backend/tests/test_agent.py --cov=backend/models --cov-report=term-missing
+
+# Run in parallel across CPU cores
+pip install pytest-xdist
+pytest backend/tests -n auto
+
+# Skip the stress tests
+pytest backend/tests -m "not slow"
 '''
 
 
@@ -47,6 +54,15 @@ class TestSkillEnum:
             assert isinstance(possessed, Skill)
             assert isinstance(needed, Skill)
             assert possessed != needed
+
+    def test_skill_random_pairs_batch(self):
+        """random_pairs(n) draws n valid, distinct skill pairs at once."""
+        possessed, needed = Skill.random_pairs(500)
+        valid = {int(s) for s in Skill}
+        assert len(possessed) == len(needed) == 500
+        assert set(possessed.tolist()) <= valid
+        assert set(needed.tolist()) <= valid
+        assert (possessed != needed).all()
     
     def test_skill_has_expected_members(self):
         """Verify expected skills exist."""
@@ -84,9 +100,8 @@ class TestAgentCreation:
         assert agent.trust_alpha == 1.0  # Default
         assert agent.trust_beta == 1.0   # Default
     
-    def test_create_random_agent(self):
+    def test_create_random_agent(self, bounds):
         """Test factory method creates valid agent."""
-        bounds = (800.0, 600.0)
         agent = Agent.create_random(agent_id=42, bounds=bounds)
         
         assert agent.agent_id == 42
@@ -117,9 +132,9 @@ class TestAgentCreation:
         assert -100.0 <= agent.vy <= 100.0
         assert agent.trust_quota == 0.8
     
-    def test_create_many_random_agents(self):
+    @pytest.mark.slow
+    def test_create_many_random_agents(self, bounds):
         """Stress test: create many agents without errors."""
-        bounds = (800.0, 600.0)
         agents = [Agent.create_random(i, bounds) for i in range(1000)]
         
         assert len(agents) == 1000
@@ -129,124 +144,42 @@ class TestAgentCreation:
 class TestAgentMovement:
     """Tests for position updates and wall bouncing."""
     
-    def test_update_position_basic(self):
-        """Test basic position update without walls."""
-        agent = Agent(
-            agent_id=1, x=100.0, y=100.0,
-            vx=10.0, vy=20.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=1.0, bounds=bounds)
-        
-        assert agent.x == 110.0
-        assert agent.y == 120.0
-        assert agent.vx == 10.0  # Velocity unchanged
-        assert agent.vy == 20.0
-    
-    def test_update_position_with_dt(self):
-        """Test position update scales with dt."""
-        agent = Agent(
-            agent_id=1, x=100.0, y=100.0,
-            vx=60.0, vy=120.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=0.5, bounds=bounds)
-        
-        assert agent.x == 130.0  # 100 + 60 * 0.5
-        assert agent.y == 160.0  # 100 + 120 * 0.5
-    
-    def test_bounce_off_right_wall(self):
-        """Test elastic bounce off right wall."""
-        agent = Agent(
-            agent_id=1, x=795.0, y=100.0,
-            vx=10.0, vy=0.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=1.0, bounds=bounds)
-        
-        assert agent.x < bounds[0]  # Bounced back
-        assert agent.vx == -10.0    # Velocity reversed
-    
-    def test_bounce_off_left_wall(self):
-        """Test elastic bounce off left wall."""
-        agent = Agent(
-            agent_id=1, x=5.0, y=100.0,
-            vx=-10.0, vy=0.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=1.0, bounds=bounds)
-        
-        assert agent.x > 0  # Bounced back
-        assert agent.vx == 10.0  # Velocity reversed
-    
-    def test_bounce_off_top_wall(self):
-        """Test elastic bounce off top wall (y=0)."""
-        agent = Agent(
-            agent_id=1, x=100.0, y=5.0,
-            vx=0.0, vy=-10.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=1.0, bounds=bounds)
-        
-        assert agent.y > 0
-        assert agent.vy == 10.0
-    
-    def test_bounce_off_bottom_wall(self):
-        """Test elastic bounce off bottom wall."""
-        agent = Agent(
-            agent_id=1, x=100.0, y=595.0,
-            vx=0.0, vy=10.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
-        
-        agent.update_position(dt=1.0, bounds=bounds)
-        
-        assert agent.y < bounds[1]
-        assert agent.vy == -10.0
-    
-    def test_corner_bounce(self):
-        """Test bounce in corner (both walls)."""
-        agent = Agent(
-            agent_id=1, x=795.0, y=595.0,
-            vx=10.0, vy=10.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
+    @pytest.mark.parametrize("vx,vy,dt,expected_x,expected_y", [
+        (10.0, 20.0, 1.0, 110.0, 120.0),   # basic move, no walls
+        (60.0, 120.0, 0.5, 130.0, 160.0),  # scales with dt
+    ])
+    def test_update_position(self, make_agent, bounds, vx, vy, dt, expected_x, expected_y):
+        """Position advances by v * dt away from walls; velocity unchanged."""
+        agent = make_agent(x=100.0, y=100.0, vx=vx, vy=vy)
+        
+        agent.update_position(dt=dt, bounds=bounds)
+        
+        assert agent.x == expected_x
+        assert agent.y == expected_y
+        assert agent.vx == vx
+        assert agent.vy == vy
+    
+    @pytest.mark.parametrize("x,y,vx,vy,expected_vx,expected_vy", [
+        (795.0, 100.0, 10.0, 0.0, -10.0, 0.0),   # right wall
+        (5.0, 100.0, -10.0, 0.0, 10.0, 0.0),     # left wall
+        (100.0, 5.0, 0.0, -10.0, 0.0, 10.0),     # top wall (y=0)
+        (100.0, 595.0, 0.0, 10.0, 0.0, -10.0),   # bottom wall
+        (795.0, 595.0, 10.0, 10.0, -10.0, -10.0),  # corner (both walls)
+    ])
+    def test_bounce_off_walls(self, make_agent, bounds, x, y, vx, vy, expected_vx, expected_vy):
+        """Elastic bounce reverses the velocity component and stays inside."""
+        agent = make_agent(x=x, y=y, vx=vx, vy=vy)
         
         agent.update_position(dt=1.0, bounds=bounds)
         
-        assert 0 <= agent.x <= bounds[0]
-        assert 0 <= agent.y <= bounds[1]
-        assert agent.vx == -10.0
-        assert agent.vy == -10.0
+        assert 0 < agent.x < bounds[0]
+        assert 0 < agent.y < bounds[1]
+        assert agent.vx == expected_vx
+        assert agent.vy == expected_vy
     
-    def test_position_stays_in_bounds_high_velocity(self):
+    def test_position_stays_in_bounds_high_velocity(self, make_agent, bounds):
         """Test that position is clamped even with very high velocity."""
-        agent = Agent(
-            agent_id=1, x=400.0, y=300.0,
-            vx=10000.0, vy=10000.0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        bounds = (800.0, 600.0)
+        agent = make_agent(x=400.0, y=300.0, vx=10000.0, vy=10000.0)
         
         agent.update_position(dt=1.0, bounds=bounds)
         
@@ -257,277 +190,101 @@ class TestAgentMovement:
 class TestAgentTrust:
     """Tests for trust-related methods."""
     
-    def test_meets_quota_true(self):
+    @pytest.mark.parametrize("trust,expected", [
+        (0.6, True),   # above quota
+        (0.5, True),   # exactly at quota
+        (0.4, False),  # below quota
+    ])
+    def test_meets_quota(self, make_agent, trust, expected):
         """Agent meets quota when trust >= trust_quota."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.6, trust_quota=0.5
-        )
-        assert agent.meets_quota() is True
-    
-    def test_meets_quota_exactly(self):
-        """Agent meets quota when trust == trust_quota."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        assert agent.meets_quota() is True
-    
-    def test_meets_quota_false(self):
-        """Agent doesn't meet quota when trust < trust_quota."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.4, trust_quota=0.5
-        )
-        assert agent.meets_quota() is False
-    
-    def test_adjust_trust_increase(self):
-        """Test trust increase."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        agent.adjust_trust(0.1)
-        
-        assert agent.trust == pytest.approx(0.6)
-    
-    def test_adjust_trust_decrease(self):
-        """Test trust decrease."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        agent.adjust_trust(-0.2)
-        
-        assert agent.trust == pytest.approx(0.3)
-    
-    def test_adjust_trust_clamps_to_max(self):
-        """Trust should not exceed 1.0."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.9, trust_quota=0.5
-        )
-        
-        agent.adjust_trust(0.5)
-        
-        assert agent.trust == 1.0
-    
-    def test_adjust_trust_clamps_to_min(self):
-        """Trust should not go below 0.0."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.1, trust_quota=0.5
-        )
-        
-        agent.adjust_trust(-0.5)
-        
-        assert agent.trust == 0.0
-    
-    def test_apply_decay(self):
+        agent = make_agent(trust=trust, trust_quota=0.5)
+        assert agent.meets_quota() is expected
+    
+    @pytest.mark.parametrize("trust,delta,expected", [
+        (0.5, 0.1, 0.6),    # increase
+        (0.5, -0.2, 0.3),   # decrease
+        (0.9, 0.5, 1.0),    # clamps to max
+        (0.1, -0.5, 0.0),   # clamps to min
+    ])
+    def test_adjust_trust(self, make_agent, trust, delta, expected):
+        """Trust moves by delta and stays within [0, 1]."""
+        agent = make_agent(trust=trust)
+        
+        agent.adjust_trust(delta)
+        
+        assert agent.trust == pytest.approx(expected)
+    
+    def test_adjust_trust_clamps_exactly(self, make_agent):
+        """Clamped values land exactly on the bounds."""
+        high = make_agent(trust=0.9)
+        low = make_agent(trust=0.1)
+        
+        high.adjust_trust(0.5)
+        low.adjust_trust(-0.5)
+        
+        assert high.trust == 1.0
+        assert low.trust == 0.0
+    
+    @pytest.mark.parametrize("trust,times,expected", [
+        (0.5, 1, 0.45),           # 10% decay
+        (1.0, 10, 0.9 ** 10),     # compounds
+    ])
+    def test_apply_decay(self, make_agent, trust, times, expected):
         """Test multiplicative trust decay."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        agent.apply_decay(0.9)  # 10% decay
-        
-        assert agent.trust == pytest.approx(0.45)
-    
-    def test_apply_decay_multiple_times(self):
-        """Test decay compounds correctly."""
-        agent = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=1.0, trust_quota=0.5
-        )
+        agent = make_agent(trust=trust)
         
-        for _ in range(10):
+        for _ in range(times):
             agent.apply_decay(0.9)
         
-        assert agent.trust == pytest.approx(1.0 * (0.9 ** 10))
+        assert agent.trust == pytest.approx(expected)
 
 
 class TestAgentSkillMatching:
     """Tests for skill matching logic."""
     
-    def test_can_provide_skill_to_match(self):
-        """Agent can provide skill when possessed matches other's needed."""
-        seller = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        buyer = Agent(
-            agent_id=2, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.TEACHING, skill_needed=Skill.COOKING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert seller.can_provide_skill_to(buyer) is True
-    
-    def test_can_provide_skill_to_no_match(self):
-        """Agent cannot provide skill when no match."""
-        agent1 = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.TEACHING, skill_needed=Skill.BUILDING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.can_provide_skill_to(agent2) is False
-    
-    def test_skills_match_mutual(self):
-        """Both agents can fulfill each other's needs."""
-        agent1 = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.CODING, skill_needed=Skill.COOKING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.skills_match(agent2) is True
-        assert agent2.skills_match(agent1) is True
-    
-    def test_skills_match_one_way_only(self):
-        """Only one agent can provide - not a mutual match."""
-        agent1 = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.TEACHING, skill_needed=Skill.COOKING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.skills_match(agent2) is False
-    
-    def test_skills_match_no_match(self):
-        """Neither agent can provide what the other needs."""
-        agent1 = Agent(
-            agent_id=1, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=0, y=0, vx=0, vy=0,
-            skill_possessed=Skill.BUILDING, skill_needed=Skill.HEALING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.skills_match(agent2) is False
+    @pytest.mark.parametrize("other_possessed,other_needed,provides,mutual", [
+        (Skill.TEACHING, Skill.COOKING, True, False),   # one way only
+        (Skill.TEACHING, Skill.BUILDING, False, False), # no match
+        (Skill.CODING, Skill.COOKING, True, True),      # mutual
+        (Skill.BUILDING, Skill.HEALING, False, False),  # neither side
+    ])
+    def test_skill_matching(self, make_agent, other_possessed, other_needed, provides, mutual):
+        """can_provide_skill_to is one-directional; skills_match needs both ways."""
+        agent1 = make_agent(agent_id=1, skill_possessed=Skill.COOKING, skill_needed=Skill.CODING)
+        agent2 = make_agent(agent_id=2, skill_possessed=other_possessed, skill_needed=other_needed)
+        
+        assert agent1.can_provide_skill_to(agent2) is provides
+        assert agent1.skills_match(agent2) is mutual
+        assert agent2.skills_match(agent1) is mutual
 
 
 class TestAgentDistance:
     """Tests for distance calculations."""
     
-    def test_distance_to_same_position(self):
-        """Distance to same position is 0."""
-        agent1 = Agent(
-            agent_id=1, x=100.0, y=100.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=100.0, y=100.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.distance_to(agent2) == 0.0
-    
-    def test_distance_to_horizontal(self):
-        """Test horizontal distance."""
-        agent1 = Agent(
-            agent_id=1, x=0.0, y=0.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=100.0, y=0.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.distance_to(agent2) == 100.0
-    
-    def test_distance_to_vertical(self):
-        """Test vertical distance."""
-        agent1 = Agent(
-            agent_id=1, x=0.0, y=0.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=0.0, y=50.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
+    @pytest.mark.parametrize("p1,p2,expected", [
+        ((100.0, 100.0), (100.0, 100.0), 0.0),  # same position
+        ((0.0, 0.0), (100.0, 0.0), 100.0),      # horizontal
+        ((0.0, 0.0), (0.0, 50.0), 50.0),        # vertical
+        ((0.0, 0.0), (3.0, 4.0), 5.0),          # 3-4-5 triangle
+    ])
+    def test_distance_to(self, make_agent, p1, p2, expected):
+        """Euclidean distance between agent positions."""
+        agent1 = make_agent(agent_id=1, x=p1[0], y=p1[1])
+        agent2 = make_agent(agent_id=2, x=p2[0], y=p2[1])
         
-        assert agent1.distance_to(agent2) == 50.0
+        assert agent1.distance_to(agent2) == expected
     
-    def test_distance_to_diagonal(self):
-        """Test diagonal distance (3-4-5 triangle)."""
-        agent1 = Agent(
-            agent_id=1, x=0.0, y=0.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=3.0, y=4.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        
-        assert agent1.distance_to(agent2) == 5.0
-    
-    def test_distance_squared_to(self):
+    def test_distance_squared_to(self, make_agent):
         """Test squared distance avoids sqrt."""
-        agent1 = Agent(
-            agent_id=1, x=0.0, y=0.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=3.0, y=4.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
+        agent1 = make_agent(agent_id=1, x=0.0, y=0.0)
+        agent2 = make_agent(agent_id=2, x=3.0, y=4.0)
         
         assert agent1.distance_squared_to(agent2) == 25.0
     
-    def test_distance_is_symmetric(self):
+    def test_distance_is_symmetric(self, make_agent):
         """Distance from A to B equals B to A."""
-        agent1 = Agent(
-            agent_id=1, x=10.0, y=20.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
-        agent2 = Agent(
-            agent_id=2, x=50.0, y=80.0, vx=0, vy=0,
-            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
-            trust=0.5, trust_quota=0.5
-        )
+        agent1 = make_agent(agent_id=1, x=10.0, y=20.0)
+        agent2 = make_agent(agent_id=2, x=50.0, y=80.0)
         
         assert agent1.distance_to(agent2) == agent2.distance_to(agent1)
 
@@ -557,7 +314,11 @@ class TestAgentSerialization:
             'trust': 0.75,
             'trust_quota': 0.5,
             'trust_alpha': 2.0,
-            'trust_beta': 3.0
+            'trust_beta': 3.0,
+            'trade_count': 0,
+            'last_trade_tick': 0,
+            'is_custom': False,
+            'group_id': 0
         }
     
     def test_to_minimal_dict(self):
@@ -574,10 +335,32 @@ class TestAgentSerialization:
             'id': 42,
             'x': 100.0,
             'y': 200.0,
+            'vx': 10.0,
+            'vy': -5.0,
             'trust': 0.75,
-            'skillPossessed': 'COOKING',
-            'skillNeeded': 'CODING'
+            'trustQuota': 0.5,
+            'skillPossessed': int(Skill.COOKING),
+            'skillNeeded': int(Skill.CODING),
+            'tradeCount': 0,
+            'isCustom': False,
+            'groupId': 0
         }
+
+    def test_to_minimal_dict_rounds_floats(self):
+        """Broadcast floats are rounded to keep payloads short."""
+        agent = Agent(
+            agent_id=1, x=100.123456, y=200.987654, vx=1.23456, vy=-5.55555,
+            skill_possessed=Skill.COOKING, skill_needed=Skill.CODING,
+            trust=0.123456, trust_quota=0.5
+        )
+
+        result = agent.to_minimal_dict()
+
+        assert result['x'] == 100.12
+        assert result['y'] == 200.99
+        assert result['vx'] == 1.23
+        assert result['vy'] == -5.56
+        assert result['trust'] == 0.123
     
     def test_to_dict_skills_are_strings(self):
         """Skills should serialize as strings, not integers."""
@@ -667,9 +450,8 @@ class TestAgentHashEquality:
 class TestAgentIntegration:
     """Integration tests simulating real usage patterns."""
     
-    def test_simulation_tick(self):
+    def test_simulation_tick(self, bounds):
         """Simulate a single tick of agent updates."""
-        bounds = (800.0, 600.0)
         agents = [Agent.create_random(i, bounds) for i in range(100)]
         dt = 1 / 60
         
@@ -722,9 +504,8 @@ class TestAgentIntegration:
         assert seller.trust == pytest.approx(0.65)
         assert buyer.trust == pytest.approx(0.75)
     
-    def test_long_running_simulation(self):
+    def test_long_running_simulation(self, bounds):
         """Test agent behavior over many ticks."""
-        bounds = (800.0, 600.0)
         agent = Agent.create_random(1, bounds, max_speed=100.0)
         dt = 1 / 60
         
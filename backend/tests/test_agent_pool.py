@@ -0,0 +1,289 @@
+# backend/tests/test_agent_pool.py
+import pytest
+import numpy as np
+from models.agent import Agent, Skill
+from models import agent_pool
+from models.agent_pool import AgentPool, AgentView, QUANTIZED_COLUMNS
+from services.collision import CollisionDetector, CELL_KEY_STRIDE
+
+
+class TestAgentPoolStorage:
+    """Tests for appending agents and reading them back through views."""
+
+    def test_append_copies_fields(self, make_agent):
+        """Appended agent's fields land in the pool columns."""
+        pool = AgentPool()
+        view = pool.append(make_agent(agent_id=7, x=10.0, y=20.0, vx=1.0, vy=-2.0, trust=0.25))
+
+        assert len(pool) == 1
+        assert isinstance(view, AgentView)
+        assert view.agent_id == 7
+        assert view.x == 10.0
+        assert view.y == 20.0
+        assert view.vx == 1.0
+        assert view.vy == -2.0
+        assert view.trust == 0.25
+        assert view.skill_possessed == Skill.COOKING
+        assert isinstance(view.skill_possessed, Skill)
+
+    def test_view_writes_through_to_pool(self, make_agent):
+        """Mutating a view updates the backing column."""
+        pool = AgentPool()
+        view = pool.append(make_agent(trust=0.5))
+
+        view.adjust_trust(0.25)
+
+        assert pool.trust[view.slot] == pytest.approx(0.75)
+
+    def test_view_equals_source_agent(self, make_agent):
+        """Views keep Agent's id-based equality and hashing."""
+        pool = AgentPool()
+        agent = make_agent(agent_id=42)
+        view = pool.append(agent)
+
+        assert view == agent
+        assert hash(view) == hash(agent)
+
+    def test_pool_grows_past_capacity(self, make_agent):
+        """Appending beyond capacity keeps earlier rows intact."""
+        pool = AgentPool(capacity=2)
+        views = [pool.append(make_agent(agent_id=i, x=float(i))) for i in range(10)]
+
+        assert len(pool) == 10
+        assert pool.capacity >= 10
+        assert [v.x for v in views] == [float(i) for i in range(10)]
+
+    def test_append_random_batch(self, bounds):
+        """append_random fills rows like Agent.create_random, in id order."""
+        pool = AgentPool(capacity=4)
+        views = pool.append_random(range(10, 110), bounds, max_speed=50.0, trust_quota=0.4, group_id=2)
+
+        assert len(pool) == 100
+        assert [v.agent_id for v in views] == list(range(10, 110))
+        n = pool.size
+        assert ((pool.x[:n] >= 0) & (pool.x[:n] <= bounds[0])).all()
+        assert ((pool.y[:n] >= 0) & (pool.y[:n] <= bounds[1])).all()
+        assert (np.abs(pool.vx[:n]) <= 50.0).all()
+        assert ((pool.trust[:n] >= 0.3) & (pool.trust[:n] <= 0.7)).all()
+        assert (pool.skill_possessed[:n] != pool.skill_needed[:n]).all()
+        assert views[0].trust_quota == pytest.approx(0.4)
+        assert views[0].group_id == 2
+        assert isinstance(views[0].skill_needed, Skill)
+        assert not views[0].is_custom
+
+    def test_append_random_custom(self, bounds):
+        """Custom overrides land on every new row."""
+        pool = AgentPool()
+        views = pool.append_random(range(3), bounds, trust_alpha=0.2, trust_beta=0.1, is_custom=True)
+
+        assert all(v.is_custom for v in views)
+        assert pool.trust_alpha[:3].tolist() == pytest.approx([0.2] * 3)
+        assert pool.trust_beta[:3].tolist() == pytest.approx([0.1] * 3)
+
+
+class TestAgentPoolSkills:
+    """Batched skill matching must match the Agent methods."""
+
+    def test_match_matrices_match_agent(self, bounds):
+        """provider/mutual matrices agree with can_provide_skill_to/skills_match."""
+        pool = AgentPool()
+        views = [pool.append(Agent.create_random(i, bounds)) for i in range(30)]
+        views.append(pool.append(Agent(
+            agent_id=30, x=0, y=0, vx=0, vy=0,
+            skill_possessed=views[0].skill_needed, skill_needed=views[0].skill_possessed,
+            trust=0.5, trust_quota=0.5,
+        )))
+
+        provides = pool.provider_matrix()
+        mutual = pool.mutual_matrix()
+
+        assert provides.tolist() == [[a.can_provide_skill_to(b) for b in views] for a in views]
+        assert mutual.tolist() == [[a.skills_match(b) for b in views] for a in views]
+        assert mutual[0, 30]
+
+
+class TestAgentPoolMotion:
+    """Vectorized motion must match Agent.update_position."""
+
+    @pytest.mark.parametrize("x,y,vx,vy", [
+        (100.0, 100.0, 10.0, 20.0),
+        (795.0, 100.0, 10.0, 0.0),
+        (5.0, 100.0, -10.0, 0.0),
+        (100.0, 5.0, 0.0, -10.0),
+        (100.0, 595.0, 0.0, 10.0),
+        (795.0, 595.0, 10.0, 10.0),
+    ])
+    def test_update_positions_matches_agent(self, make_agent, bounds, x, y, vx, vy):
+        """Pool motion and bounce agree with the scalar Agent path."""
+        agent = make_agent(x=x, y=y, vx=vx, vy=vy)
+        pool = AgentPool()
+        view = pool.append(agent)
+
+        agent.update_position(1.0, bounds)
+        pool.update_positions(1.0, bounds)
+
+        assert view.x == pytest.approx(agent.x)
+        assert view.y == pytest.approx(agent.y)
+        assert view.vx == agent.vx
+        assert view.vy == agent.vy
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    @pytest.mark.parametrize("x,y,vx,vy", [
+        (100.0, 100.0, -1100.0, 0.0),
+        (700.0, 100.0, 1100.0, 0.0),
+        (100.0, 100.0, 0.0, -900.0),
+        (100.0, 500.0, 0.0, 900.0),
+        (400.0, 300.0, 10000.0, -10000.0),
+        (0.0, 600.0, 0.0, 0.0),
+    ])
+    def test_update_positions_overshoot_matches_agent(self, make_agent, bounds, monkeypatch, use_numba, x, y, vx, vy):
+        """Steps that cross the whole world clamp like Agent, on both paths."""
+        monkeypatch.setattr(agent_pool, "HAVE_NUMBA", agent_pool.HAVE_NUMBA and use_numba)
+        agent = make_agent(x=x, y=y, vx=vx, vy=vy)
+        pool = AgentPool()
+        view = pool.append(agent)
+
+        agent.update_position(1.0, bounds)
+        pool.update_positions(1.0, bounds)
+
+        assert view.x == pytest.approx(agent.x)
+        assert view.y == pytest.approx(agent.y)
+        assert view.vx == agent.vx
+        assert view.vy == agent.vy
+
+    def test_update_positions_stays_in_bounds(self, make_agent, bounds):
+        """Very high velocities are clamped into the world."""
+        pool = AgentPool()
+        pool.append(make_agent(x=400.0, y=300.0, vx=10000.0, vy=10000.0))
+
+        pool.update_positions(1.0, bounds)
+
+        assert 0 <= pool.x[0] <= bounds[0]
+        assert 0 <= pool.y[0] <= bounds[1]
+
+    def test_per_slot_dt(self, make_agent, bounds):
+        """dt can be an array with one entry per agent."""
+        pool = AgentPool()
+        pool.append(make_agent(agent_id=1, x=100.0, vx=10.0))
+        pool.append(make_agent(agent_id=2, x=100.0, vx=10.0))
+
+        pool.update_positions(np.array([1.0, 2.0], dtype=np.float32), bounds)
+
+        assert pool.x[0] == pytest.approx(110.0)
+        assert pool.x[1] == pytest.approx(120.0)
+
+    def test_clamp_speed(self, make_agent):
+        """Velocities are clamped to +/- max_speed per component."""
+        pool = AgentPool()
+        view = pool.append(make_agent(vx=500.0, vy=-500.0))
+        view.max_speed = 80.0
+
+        pool.clamp_speed()
+
+        assert view.vx == 80.0
+        assert view.vy == -80.0
+
+    def test_advance_matches_separate_passes(self, bounds):
+        """advance equals update_positions + clamp_speed + apply_decay."""
+        rng = np.random.default_rng(0)
+        fused, separate = AgentPool(), AgentPool()
+        for pool in (fused, separate):
+            pool.append_random(range(50), bounds, max_speed=200.0, rng=np.random.default_rng(1))
+        dt = rng.uniform(0.5, 2.0, 50).astype(np.float32)
+        decay = np.where(rng.random(50) < 0.5, 0.9, 1.0).astype(np.float32)
+
+        fused.advance(dt, bounds, decay)
+        separate.update_positions(dt, bounds)
+        separate.clamp_speed()
+        separate.apply_decay(decay)
+
+        for column in ("x", "y", "vx", "vy", "trust"):
+            assert getattr(fused, column)[:50].tolist() == getattr(separate, column)[:50].tolist()
+
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_advance_cell_keys_match_detector(self, bounds, monkeypatch, use_numba):
+        """Keys written by advance equal CollisionDetector.cell_keys of the moved slots."""
+        monkeypatch.setattr(agent_pool, "HAVE_NUMBA", agent_pool.HAVE_NUMBA and use_numba)
+        detector = CollisionDetector(collision_radius=8.0)
+        pool = AgentPool()
+        pool.append_random(range(500), bounds, max_speed=200.0, rng=np.random.default_rng(2))
+        keys = np.full(pool.capacity, -1, dtype=np.int64)
+
+        pool.advance(1.0, bounds, cell_keys=keys, inv_cell=detector.grid.inv_cell_size, key_stride=CELL_KEY_STRIDE)
+
+        assert keys[:500].tolist() == detector.cell_keys(pool.x[:500], pool.y[:500]).tolist()
+
+
+class TestAgentPoolTrust:
+    """Vectorized trust updates must match the Agent methods."""
+
+    def test_adjust_trust_clamps(self, make_agent):
+        """Per-slot deltas are applied and clamped like Agent.adjust_trust."""
+        pool = AgentPool()
+        for i, trust in enumerate((0.9, 0.1, 0.5)):
+            pool.append(make_agent(agent_id=i, trust=trust))
+
+        pool.adjust_trust(np.array([0.5, -0.5, 0.25]))
+
+        assert pool.trust[:3].tolist() == pytest.approx([1.0, 0.0, 0.75])
+
+    def test_meets_quota(self, make_agent):
+        """meets_quota matches trust >= trust_quota per slot."""
+        pool = AgentPool()
+        pool.append(make_agent(agent_id=1, trust=0.5, trust_quota=0.5))
+        pool.append(make_agent(agent_id=2, trust=0.4, trust_quota=0.5))
+
+        assert pool.meets_quota().tolist() == [True, False]
+
+    def test_apply_decay_masked(self, make_agent):
+        """Only masked slots decay, with the same clamp as Agent.apply_decay."""
+        pool = AgentPool()
+        pool.append(make_agent(agent_id=1, trust=0.5))
+        pool.append(make_agent(agent_id=2, trust=0.5))
+
+        pool.apply_decay(np.array([0.5, 0.5]), np.array([True, False]))
+
+        assert pool.trust[0] == pytest.approx(0.25)
+        assert pool.trust[1] == pytest.approx(0.5)
+
+
+class TestAgentPoolSerialization:
+    """Tests for column-wise serialization."""
+
+    def test_to_minimal_dicts_matches_agent(self, bounds):
+        """Column-built dicts match Agent.to_minimal_dict for each slot."""
+        pool = AgentPool()
+        views = [pool.append(Agent.create_random(i, bounds)) for i in range(5)]
+
+        assert pool.to_minimal_dicts() == [v.to_minimal_dict() for v in views]
+
+    def test_to_columns_matches_minimal_dicts(self, bounds):
+        """Each column lines up with the same key of the per-agent dicts."""
+        pool = AgentPool()
+        for i in range(5):
+            pool.append(Agent.create_random(i, bounds))
+
+        columns = pool.to_columns()
+        dicts = pool.to_minimal_dicts()
+
+        assert set(columns) == set(dicts[0])
+        for key, values in columns.items():
+            assert values.tolist() == pytest.approx([d[key] for d in dicts], abs=0.01)
+
+    def test_quantized_bytes_round_trip(self, bounds):
+        """Quantized columns decode back to within one step of the source."""
+        pool = AgentPool()
+        views = [pool.append(Agent.create_random(i, bounds)) for i in range(5)]
+
+        data = pool.to_quantized_bytes(bounds)
+        columns = {}
+        offset = 0
+        for key, dtype in QUANTIZED_COLUMNS:
+            columns[key] = np.frombuffer(data, dtype=dtype, count=len(pool), offset=offset)
+            offset += columns[key].nbytes
+
+        assert offset == len(data)
+        assert columns["id"].tolist() == [v.agent_id for v in views]
+        assert columns["x"].astype(float) * bounds[0] / 65535 == pytest.approx([v.x for v in views], abs=0.02)
+        assert columns["trust"].astype(float) / 255 == pytest.approx([v.trust for v in views], abs=0.002)
@@ -0,0 +1,194 @@
+# backend/tests/test_collision.py
+import pytest
+import numpy as np
+from models.agent import Skill
+from models.agent_pool import AgentPool
+from services import collision
+from services.collision import CollisionDetector, BRUTE_FORCE_MAX
+from services.collision_kernels import resolve_pairs, RESPONSE_NEUTRAL, RESPONSE_HARD, RESPONSE_SOFT
+from services.collision_response import apply_soft_separation, apply_hard_bounce, apply_neutral_bounce
+from services.trust import TrustEngine
+
+
+def brute_force_pairs(x, y, radius):
+    """Reference O(n²) scan with the same float32 distance test."""
+    radius_sq = np.float32(radius * radius)
+    pairs = []
+    for a in range(len(x)):
+        for b in range(a + 1, len(x)):
+            dx = x[b] - x[a]
+            dy = y[b] - y[a]
+            if dx * dx + dy * dy <= radius_sq:
+                pairs.append((a, b))
+    return pairs
+
+
+def lattice(bounds, spacing):
+    """Positions on every multiple of spacing, so all lie on cell edges."""
+    xs, ys = np.meshgrid(
+        np.arange(0.0, bounds[0] + spacing, spacing),
+        np.arange(0.0, bounds[1] + spacing, spacing),
+    )
+    return xs.ravel().astype(np.float32), ys.ravel().astype(np.float32)
+
+
+class TestDetectPairArrays:
+    """detect_pair_arrays must find exactly the brute-force pairs, in order."""
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    @pytest.mark.parametrize("n", [2, BRUTE_FORCE_MAX - 1, BRUTE_FORCE_MAX, 300])
+    def test_matches_brute_force(self, monkeypatch, use_numba, n):
+        """Random scenes on both sides of BRUTE_FORCE_MAX match the O(n²) scan."""
+        monkeypatch.setattr(collision, "HAVE_NUMBA", use_numba)
+        rng = np.random.default_rng(n)
+        x = rng.uniform(0.0, 300.0, n).astype(np.float32)
+        y = rng.uniform(0.0, 300.0, n).astype(np.float32)
+
+        a, b = CollisionDetector(collision_radius=50.0).detect_pair_arrays(x, y)
+
+        assert a.dtype == np.int32 and b.dtype == np.int32
+        assert list(zip(a.tolist(), b.tolist())) == brute_force_pairs(x, y, 50.0)
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    def test_cell_boundaries(self, bounds, monkeypatch, use_numba):
+        """Agents exactly on cell edges and exactly one radius apart collide."""
+        monkeypatch.setattr(collision, "HAVE_NUMBA", use_numba)
+        x, y = lattice(bounds, 50.0)
+        assert len(x) > BRUTE_FORCE_MAX
+
+        a, b = CollisionDetector(collision_radius=50.0).detect_pair_arrays(x, y)
+
+        expected = brute_force_pairs(x, y, 50.0)
+        # Each lattice point touches its right and lower neighbours only
+        columns = int(bounds[0] // 50) + 1
+        rows = int(bounds[1] // 50) + 1
+        assert len(expected) == (columns - 1) * rows + columns * (rows - 1)
+        assert list(zip(a.tolist(), b.tolist())) == expected
+
+    @pytest.mark.parametrize("use_numba", [True, False])
+    @pytest.mark.parametrize("n", [BRUTE_FORCE_MAX - 1, 300])
+    def test_pairs_ordered(self, monkeypatch, use_numba, n):
+        """Pairs have slot_a < slot_b and are sorted by (slot_a, slot_b)."""
+        monkeypatch.setattr(collision, "HAVE_NUMBA", use_numba)
+        rng = np.random.default_rng(7)
+        x = rng.uniform(0.0, 200.0, n).astype(np.float32)
+        y = rng.uniform(0.0, 200.0, n).astype(np.float32)
+
+        a, b = CollisionDetector(collision_radius=50.0).detect_pair_arrays(x, y)
+        pairs = list(zip(a.tolist(), b.tolist()))
+
+        assert pairs
+        assert all(i < j for i, j in pairs)
+        assert pairs == sorted(pairs)
+
+    def test_grid_pairs_matches_numpy_path(self, bounds, monkeypatch):
+        """The compiled grid_pairs scan returns the same arrays as searchsorted."""
+        rng = np.random.default_rng(3)
+        x = rng.uniform(0.0, bounds[0], 2000).astype(np.float32)
+        y = rng.uniform(0.0, bounds[1], 2000).astype(np.float32)
+        detector = CollisionDetector(collision_radius=15.0)
+
+        monkeypatch.setattr(collision, "HAVE_NUMBA", True)
+        grid_a, grid_b = detector.detect_pair_arrays(x, y)
+        monkeypatch.setattr(collision, "HAVE_NUMBA", False)
+        numpy_a, numpy_b = detector.detect_pair_arrays(x, y)
+
+        assert len(grid_a) > 0
+        assert grid_a.dtype == numpy_a.dtype and grid_b.dtype == numpy_b.dtype
+        np.testing.assert_array_equal(grid_a, numpy_a)
+        np.testing.assert_array_equal(grid_b, numpy_b)
+
+
+# Separation impulses per response; distinct so the chosen response shows
+SOFT, HARD, NEUTRAL = 0.8, 6.0, 2.0
+RADIUS = 8.0
+
+
+def resolve_reference(engine, a, b):
+    """The scalar tick: apply_collision_logic in the matching direction, then
+    soft after a trade, hard on a skill match without one, else neutral."""
+    if a.can_provide_skill_to(b):
+        result = engine.apply_collision_logic(a, b)
+    elif b.can_provide_skill_to(a):
+        result = engine.apply_collision_logic(b, a)
+    else:
+        result = None
+    if result is not None and result.trade:
+        a.trade_count += 1
+        b.trade_count += 1
+        apply_soft_separation(a, b, RADIUS, SOFT)
+    elif result is not None:
+        apply_hard_bounce(a, b, RADIUS, HARD)
+    else:
+        apply_neutral_bounce(a, b, RADIUS, NEUTRAL)
+    return result
+
+
+class TestResolvePairs:
+    """The compiled resolve_pairs pass must match the scalar collision path."""
+
+    @pytest.mark.parametrize("trust_a,trust_b,needs_a,needs_b,expected_case,strength", [
+        pytest.param(0.25, 0.25, Skill.TEACHING, Skill.COOKING,
+                     "case_1_neither_meets_quota", HARD, id="neither_meets_quota"),
+        pytest.param(0.75, 0.25, Skill.TEACHING, Skill.COOKING,
+                     "case_2_seller_meets_buyer_doesnt", HARD, id="seller_meets_buyer_doesnt"),
+        pytest.param(0.25, 0.75, Skill.TEACHING, Skill.COOKING,
+                     "case_3_buyer_meets_seller_doesnt", HARD, id="buyer_meets_seller_doesnt"),
+        pytest.param(0.5, 0.5, Skill.TEACHING, Skill.COOKING,
+                     "case_4_both_meet_skills_match", SOFT, id="both_meet_skills_match"),
+        pytest.param(0.5, 0.5, Skill.BUILDING, Skill.TEACHING,
+                     "case_4_both_meet_skills_match", SOFT, id="reverse_direction_trade"),
+        pytest.param(0.75, 0.75, Skill.TEACHING, Skill.HEALING,
+                     None, NEUTRAL, id="no_skill_match"),
+    ])
+    def test_matches_scalar_path(self, make_agent, trust_a, trust_b, needs_a, needs_b, expected_case, strength):
+        """Trust, positions, velocities and trade counts agree for one pair."""
+        def pair():
+            a = make_agent(
+                agent_id=1, x=100.0, y=100.0, vx=1.0, vy=-2.0, trust=trust_a,
+                skill_possessed=Skill.COOKING, skill_needed=needs_a,
+                trust_alpha=0.25, trust_beta=0.125, is_custom=True,
+            )
+            b = make_agent(
+                agent_id=2, x=103.0, y=104.0, vx=-3.0, vy=0.5, trust=trust_b,
+                skill_possessed=Skill.BUILDING, skill_needed=needs_b,
+                trust_alpha=0.5, trust_beta=0.0625, is_custom=True,
+            )
+            return a, b
+
+        plain_a, plain_b = pair()
+        result = resolve_reference(TrustEngine(0.1, 0.05), plain_a, plain_b)
+
+        pool = AgentPool()
+        view_a, view_b = (pool.append(agent) for agent in pair())
+        n = pool.size
+        strengths = np.empty(4)
+        strengths[RESPONSE_NEUTRAL] = NEUTRAL
+        strengths[RESPONSE_HARD] = HARD
+        strengths[RESPONSE_SOFT] = SOFT
+        trades = np.zeros(1, dtype=np.bool_)
+        resolve_pairs(
+            np.array([0], dtype=np.int32), np.array([1], dtype=np.int32),
+            pool.x, pool.y, pool.vx, pool.vy,
+            pool.trust, pool.trust[:n] >= pool.trust_quota[:n],
+            pool.trust_alpha, pool.trust_beta, pool.is_custom, True,
+            pool.skill_possessed, pool.skill_needed, pool.group_id,
+            np.full(1, 0.1, dtype=np.float32), np.full(1, 0.05, dtype=np.float32),
+            pool.trade_count, pool.last_trade_tick, 9,
+            RADIUS, strengths,
+            trades,
+        )
+
+        assert (result.case_name if result else None) == expected_case
+        assert bool(trades[0]) == bool(result and result.trade)
+        # The pair normal is (-0.6, -0.8), so the response impulse shifts a's
+        # velocity by 1.4 * strength in total
+        assert abs(plain_a.vx - 1.0) + abs(plain_a.vy + 2.0) == pytest.approx(strength * 1.4, abs=0.01)
+        for view, plain in ((view_a, plain_a), (view_b, plain_b)):
+            assert view.trust == pytest.approx(plain.trust)
+            assert view.trade_count == plain.trade_count
+            assert view.x == pytest.approx(plain.x, abs=1e-4)
+            assert view.y == pytest.approx(plain.y, abs=1e-4)
+            assert view.vx == pytest.approx(plain.vx, abs=1e-4)
+            assert view.vy == pytest.approx(plain.vy, abs=1e-4)
+        assert view_a.last_trade_tick == (9 if trades[0] else plain_a.last_trade_tick)
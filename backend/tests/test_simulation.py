@@ -0,0 +1,53 @@
+# backend/tests/test_simulation.py
+import pytest
+from services.collision import CollisionDetector
+from services.simulation import SimulationEngine
+
+
+class TestLazyMetrics:
+    """Metrics refreshed on read must equal an eager update_metrics()."""
+
+    @pytest.mark.parametrize("read_every", [1, 3])
+    def test_metrics_after_step_match_eager_update(self, read_every):
+        """Reads after step() see the same metrics a full recompute gives."""
+        engine = SimulationEngine()
+        engine.start(num_agents=300, trust_decay=0.99, trust_quota=0.5)
+        state = engine.state
+
+        for tick in range(1, 31):
+            engine.step()
+            if tick % read_every:
+                continue
+            lazy = state._broadcast_payload()
+            state.update_metrics()
+            eager = state._broadcast_payload()
+
+            assert lazy["metrics"] == eager["metrics"]
+            assert lazy["groups"] == eager["groups"]
+            assert state.metrics == eager["metrics"]
+
+
+class TestCellKeyReuse:
+    """The broadphase reuses cell keys from the previous motion pass only while valid."""
+
+    def test_keys_reused_until_agents_join(self, monkeypatch):
+        """Cached keys match fresh hashing; added agents force a recompute."""
+        engine = SimulationEngine()
+        engine.start(num_agents=300, trust_decay=0.99, trust_quota=0.5)
+        detect = CollisionDetector.detect_pair_arrays
+        calls = []
+
+        def spy(detector, x, y, keys=None):
+            calls.append(keys is not None)
+            if keys is not None:
+                assert keys.tolist() == detector.cell_keys(x, y).tolist()
+            return detect(detector, x, y, keys)
+
+        monkeypatch.setattr(CollisionDetector, "detect_pair_arrays", spy)
+        for _ in range(5):
+            engine.step()
+        engine.create_group(1, 20, None)
+        engine.step()
+        engine.step()
+
+        assert calls == [False, True, True, True, True, False, True]
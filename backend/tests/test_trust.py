@@ -0,0 +1,52 @@
+# backend/tests/test_trust.py
+import pytest
+from models.agent import Skill
+from models.agent_pool import AgentPool, AgentView
+from services.trust import TrustEngine
+
+
+# Seller provides COOKING; buyer_needs decides whether the skills match.
+# Trust values and rates are exact in float32, so pooled and plain results
+# can be compared with ==.
+CASES = [
+    pytest.param(0.25, 0.25, Skill.COOKING, "case_1_neither_meets_quota", id="neither_meets_quota"),
+    pytest.param(0.75, 0.25, Skill.COOKING, "case_2_seller_meets_buyer_doesnt", id="seller_meets_buyer_doesnt"),
+    pytest.param(0.25, 0.75, Skill.COOKING, "case_3_buyer_meets_seller_doesnt", id="buyer_meets_seller_doesnt"),
+    pytest.param(0.5, 0.5, Skill.COOKING, "case_4_both_meet_skills_match", id="both_meet_skills_match"),
+    pytest.param(0.75, 0.75, Skill.HEALING, "no_skill_match", id="no_skill_match"),
+    pytest.param(0.875, 0.75, Skill.COOKING, "case_4_both_meet_skills_match", id="trade_clamps_at_one"),
+]
+
+
+class TestPooledCollisionLogic:
+    """The pooled (trust_collide) path must match the plain Agent path."""
+
+    @pytest.mark.parametrize("seller_trust,buyer_trust,buyer_needs,expected_case", CASES)
+    def test_pooled_matches_plain(self, make_agent, seller_trust, buyer_trust, buyer_needs, expected_case):
+        """Same trust values and CollisionResult for Agents and pooled views."""
+        def pair():
+            seller = make_agent(
+                agent_id=1, trust=seller_trust, trust_quota=0.5,
+                skill_possessed=Skill.COOKING, skill_needed=Skill.TEACHING,
+                trust_alpha=0.25, trust_beta=0.125,
+            )
+            buyer = make_agent(
+                agent_id=2, trust=buyer_trust, trust_quota=0.5,
+                skill_possessed=Skill.BUILDING, skill_needed=buyer_needs,
+                trust_alpha=0.5, trust_beta=0.0625,
+            )
+            return seller, buyer
+
+        engine = TrustEngine(global_alpha=0.1, global_beta=0.05)
+        plain_seller, plain_buyer = pair()
+        pool = AgentPool()
+        pooled_seller, pooled_buyer = (pool.append(a) for a in pair())
+        assert isinstance(pooled_seller, AgentView)
+
+        plain = engine.apply_collision_logic(plain_seller, plain_buyer)
+        pooled = engine.apply_collision_logic(pooled_seller, pooled_buyer)
+
+        assert plain.case_name == expected_case
+        assert pooled == plain
+        assert pooled_seller.trust == plain_seller.trust
+        assert pooled_buyer.trust == plain_buyer.trust
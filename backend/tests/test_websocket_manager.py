@@ -0,0 +1,304 @@
+# backend/tests/test_websocket_manager.py
+import asyncio
+import orjson
+import pytest
+from services.websocket_manager import (
+    ConnectionManager,
+    diff_dicts,
+    diff_agents,
+    ENCODING_DELTA,
+    ENCODING_JSON,
+    MAX_SEND_STRIDE,
+    SEND_QUEUE_SIZE,
+    STRIDE_RECOVERY_FRAMES,
+)
+
+
+class FakeWebSocket:
+    """Records every frame sent to it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(orjson.loads(text))
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def delta_client(manager):
+    """A delta-encoding client with a queue but no writer, so frames stay queued."""
+    ws = FakeWebSocket()
+    manager.active_connections.add(ws)
+    manager.client_data[ws] = {"queue": asyncio.Queue(maxsize=SEND_QUEUE_SIZE)}
+    manager.set_encoding(ws, ENCODING_DELTA)
+    return ws
+
+
+def drain(manager, ws):
+    """Decoded frames queued for ws, oldest first."""
+    queue = manager.client_data[ws]["queue"]
+    frames = []
+    while not queue.empty():
+        frames.append(orjson.loads(queue.get_nowait()))
+    return frames
+
+
+def state_update(tick, agents, **fields):
+    return {"type": "state_update", "payload": {"tick": tick, "agents": agents, **fields}}
+
+
+def apply_delta(state, delta):
+    """Client-side merge of a state_delta payload into a full payload."""
+    state = dict(state)
+    agents = {a["id"]: dict(a) for a in state["agents"]}
+    for key, value in delta.items():
+        if key not in ("agents", "removedAgents"):
+            state[key] = value
+    for change in delta["agents"]:
+        agents.setdefault(change["id"], {}).update(change)
+    for agent_id in delta["removedAgents"]:
+        del agents[agent_id]
+    state["agents"] = list(agents.values())
+    return state
+
+
+class TestDiff:
+    """Tests for the payload and agent diff helpers."""
+
+    def test_diff_dicts_nested(self):
+        """Only changed leaves come back; dropped keys map to None."""
+        old = {"tick": 1, "metrics": {"avg": 0.5, "gini": 0.1}, "gone": 3}
+        new = {"tick": 2, "metrics": {"avg": 0.5, "gini": 0.2}, "added": True}
+
+        assert diff_dicts(old, new) == {"tick": 2, "metrics": {"gini": 0.2}, "added": True, "gone": None}
+
+    def test_diff_dicts_unchanged(self):
+        """Equal dicts diff to nothing."""
+        assert diff_dicts({"a": {"b": 1}}, {"a": {"b": 1}}) == {}
+
+    def test_diff_agents(self):
+        """Changed fields, new agents whole, and removed ids."""
+        old = [{"id": 1, "x": 1.0, "trust": 0.5}, {"id": 2, "x": 2.0, "trust": 0.5}]
+        new = [{"id": 1, "x": 1.5, "trust": 0.5}, {"id": 3, "x": 3.0, "trust": 0.4}]
+
+        changed, removed = diff_agents(old, new)
+
+        assert changed == [{"id": 1, "x": 1.5}, {"id": 3, "x": 3.0, "trust": 0.4}]
+        assert removed == [2]
+
+
+class TestBroadcastDelta:
+    """Tests for delta clients: full snapshot on (re)sync, diffs after."""
+
+    def test_first_send_is_full_then_delta(self):
+        """A new delta client gets the full state_update, then only changes."""
+        async def run():
+            manager = ConnectionManager()
+            ws = delta_client(manager)
+            first = state_update(1, [{"id": 1, "x": 1.0}, {"id": 2, "x": 2.0}], groupId=0)
+            await manager.broadcast_delta(first, [ws])
+            await manager.broadcast_delta(state_update(2, [{"id": 1, "x": 1.5}], groupId=0), [ws])
+            return drain(manager, ws), first
+
+        (full, delta), first = asyncio.run(run())
+
+        assert full == first
+        assert delta == {
+            "type": "state_delta",
+            "payload": {"tick": 2, "agents": [{"id": 1, "x": 1.5}], "removedAgents": [2]},
+        }
+
+    def test_overflow_replaces_queue_with_full_state(self):
+        """An overflowing client's queued diffs give way to the current state."""
+        async def run():
+            manager = ConnectionManager()
+            ws = delta_client(manager)
+            for tick in range(SEND_QUEUE_SIZE + 1):
+                await manager.broadcast_delta(state_update(tick, [{"id": 1, "x": float(tick)}]), [ws])
+            return drain(manager, ws)
+
+        frames = asyncio.run(run())
+
+        assert frames == [state_update(SEND_QUEUE_SIZE, [{"id": 1, "x": float(SEND_QUEUE_SIZE)}])]
+
+    def test_slow_reader_rebuilds_current_state(self):
+        """Frames read behind a repeatedly full queue replay to the sent states."""
+        async def run():
+            manager = ConnectionManager()
+            ws = delta_client(manager)
+            sent = {}
+            received = []
+            for tick in range(96):
+                # Each tick moves one agent, so a lost diff would leave it stale
+                agents = [{"id": i, "x": float(tick if i == tick % 5 else 0)} for i in range(5)]
+                message = state_update(tick, agents)
+                sent[tick] = orjson.loads(orjson.dumps(message["payload"]))
+                await manager.broadcast_delta(message, [ws])
+                if tick % 12 == 11:
+                    received.append(drain(manager, ws))
+            return sent, received
+
+        sent, received = asyncio.run(run())
+
+        state = None
+        full_frames = 0
+        for batch in received:
+            for frame in batch:
+                if frame["type"] == "state_update":
+                    full_frames += 1
+                    state = frame["payload"]
+                else:
+                    state = apply_delta(state, frame["payload"])
+                assert state == sent[state["tick"]]
+            # The last frame read is the newest state the client was offered
+            assert state["tick"] == max(f["payload"]["tick"] for f in batch)
+        # The first sync plus at least one overflow resync
+        assert full_frames >= 2
+
+    def test_stride_skips_keep_deltas_consistent(self):
+        """Clients on a stride get deltas against the last payload they were sent."""
+        async def run():
+            manager = ConnectionManager()
+            fast, slow = delta_client(manager), delta_client(manager)
+            manager.client_data[slow]["stride"] = 3
+            sent = {}
+            received = {fast: [], slow: []}
+            for tick in range(12):
+                agents = [{"id": i, "x": float(tick * i)} for i in range(tick % 4 + 1)]
+                message = state_update(tick, agents)
+                sent[tick] = orjson.loads(orjson.dumps(message["payload"]))
+                await manager.broadcast_delta(message, [fast, slow])
+                for ws in (fast, slow):
+                    received[ws] += drain(manager, ws)
+            return sent, received[fast], received[slow]
+
+        sent, fast_frames, slow_frames = asyncio.run(run())
+
+        for frames in (fast_frames, slow_frames):
+            assert frames[0]["type"] == "state_update"
+            assert all(f["type"] == "state_delta" for f in frames[1:])
+            state = frames[0]["payload"]
+            for frame in frames[1:]:
+                state = apply_delta(state, frame["payload"])
+                assert state == sent[state["tick"]]
+        assert len(fast_frames) == 12
+        assert len(slow_frames) == 4
+
+    def test_encoding_switch_resyncs(self):
+        """Switching back to delta starts again from a full snapshot."""
+        async def run():
+            manager = ConnectionManager()
+            ws = delta_client(manager)
+            await manager.broadcast_delta(state_update(1, [{"id": 1, "x": 1.0}]), [ws])
+            manager.set_encoding(ws, ENCODING_JSON)
+            manager.set_encoding(ws, ENCODING_DELTA)
+            await manager.broadcast_delta(state_update(2, [{"id": 1, "x": 2.0}]), [ws])
+            return drain(manager, ws)
+
+        frames = asyncio.run(run())
+
+        assert [f["type"] for f in frames] == ["state_update", "state_update"]
+
+    def test_missing_payload_is_ignored(self):
+        """get_broadcast_state() returns {} before a simulation exists."""
+        async def run():
+            manager = ConnectionManager()
+            ws = delta_client(manager)
+            await manager.broadcast_delta({}, [ws])
+            return drain(manager, ws)
+
+        assert asyncio.run(run()) == []
+
+
+class SlowWebSocket(FakeWebSocket):
+    """Yields mid-send and records whether two sends ever overlapped."""
+
+    def __init__(self):
+        super().__init__()
+        self.sending = False
+        self.overlapped = False
+
+    async def send_text(self, text):
+        self.overlapped = self.overlapped or self.sending
+        self.sending = True
+        await asyncio.sleep(0)
+        await super().send_text(text)
+        self.sending = False
+
+
+class TestSendQueue:
+    """Tests for the per-client queue, writer task and send lock."""
+
+    def test_enqueue_drops_oldest(self):
+        """A full queue loses its oldest frame, not the new one."""
+        async def run():
+            manager = ConnectionManager()
+            ws = FakeWebSocket()
+            manager.client_data[ws] = {"queue": asyncio.Queue(maxsize=SEND_QUEUE_SIZE)}
+            for i in range(SEND_QUEUE_SIZE + 1):
+                manager._enqueue([ws], f'"{i}"')
+            return drain(manager, ws)
+
+        assert asyncio.run(run()) == [str(i) for i in range(1, SEND_QUEUE_SIZE + 1)]
+
+    def test_disconnect_cancels_writer(self):
+        """disconnect stops the client's writer task."""
+        async def run():
+            manager = ConnectionManager()
+            ws = FakeWebSocket()
+            await manager.connect(ws)
+            writer = manager.client_data[ws]["writer"]
+            manager.disconnect(ws)
+            await asyncio.sleep(0)
+            return writer, manager
+
+        writer, manager = asyncio.run(run())
+
+        assert writer.cancelled()
+        assert manager.client_data == {}
+
+    def test_stride_rises_on_overflow_and_recovers(self):
+        """Each overflow doubles the stride; drained deliveries halve it again."""
+        async def run():
+            manager = ConnectionManager()
+            ws = FakeWebSocket()
+            manager.client_data[ws] = {"queue": asyncio.Queue(maxsize=SEND_QUEUE_SIZE)}
+            data = manager.client_data[ws]
+            strides = []
+            # Never drained: every delivered frame past the first few overflows
+            for _ in range(SEND_QUEUE_SIZE + 2 * MAX_SEND_STRIDE):
+                manager._enqueue([ws], "0")
+                if not strides or strides[-1] != data.get("stride", 1):
+                    strides.append(data.get("stride", 1))
+            # Drained after every broadcast: the stride steps back down
+            for _ in range(4 * STRIDE_RECOVERY_FRAMES * MAX_SEND_STRIDE):
+                drain(manager, ws)
+                manager._enqueue([ws], "0")
+                if strides[-1] != data.get("stride", 1):
+                    strides.append(data.get("stride", 1))
+            return strides
+
+        assert asyncio.run(run()) == [1, 2, 4, 8, 4, 2, 1]
+
+    def test_personal_message_does_not_interleave(self):
+        """Direct replies wait for the writer's in-flight frame."""
+        async def run():
+            manager = ConnectionManager()
+            ws = SlowWebSocket()
+            await manager.connect(ws)
+            await manager.broadcast({"type": "state_update"})
+            await asyncio.sleep(0)
+            await manager.send_personal_message({"type": "group_created"}, ws)
+            await asyncio.sleep(0)
+            manager.disconnect(ws)
+            return ws
+
+        ws = asyncio.run(run())
+
+        assert not ws.overlapped
+        assert [m["type"] for m in ws.sent] == ["state_update", "group_created"]